@@ -0,0 +1,242 @@
+"""
+Staffing Pipeline Benchmark
+Times every stage of the dashboard and static-generator pipeline on synthetic workbooks
+(load, derived metrics, tab 4 filtering, both Excel exports, generate_html), records each
+stage's peak memory and writes the results as JSON so runs can be compared. The detailed
+export is read back with openpyxl to check its header style, date cells and auto-filter.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook as open_workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import staffing_data  # noqa: E402
+from staffing_data import load_workbook, clean_summary, prepare_detail  # noqa: E402
+from staffing_metrics import MetricsCube  # noqa: E402
+from staffing_index import FilterIndex  # noqa: E402
+from staffing_export import export_frame, excel_bytes  # noqa: E402
+from generate_static_dashboard import generate_html  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+from staffing_timing import TIMER  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+RESULTS_FORMAT = 1
+PAGE_SIZE = 100
+
+
+def measure(func, repeat, memory=True):
+    """
+    Run func `repeat` times and return (result, stats): best/mean wall-clock seconds and,
+    with memory=True, the peak bytes traced during one extra run
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    stats = {'seconds': min(times), 'mean_seconds': sum(times) / len(times), 'runs': len(times)}
+
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, stats
+
+
+def filter_combinations(cube):
+    """Representative tab 4 filter selections (status, area, team and combinations)"""
+    areas = cube.values('Technology Area')
+    teams = cube.values('TEAM NAME')
+    return [
+        {'Status': ['Open']},
+        {'Technology Area': areas[:1]},
+        {'Status': ['Open', 'On Hold'], 'Technology Area': areas[:2]},
+        {'Status': ['Closed'], 'Technology Area': areas[:3], 'TEAM NAME': teams[:5]},
+    ]
+
+
+def baseline_filter(detailed_df, filters):
+    """The original tab 4 filtering: copy the frame, then chain one isin mask per filter"""
+    filtered = detailed_df.copy()
+    for col, values in filters.items():
+        filtered = filtered[filtered[col].isin(values)]
+    return filtered
+
+
+def check_export(data, export_df):
+    """Open an exported .xlsx with openpyxl and check its size, header style, date cells and auto-filter"""
+    worksheet = open_workbook(io.BytesIO(data)).active
+    assert (worksheet.max_row, worksheet.max_column) == (len(export_df) + 1, len(export_df.columns)), 'sheet size'
+    assert worksheet.auto_filter.ref == worksheet.dimensions, 'auto-filter range'
+    header = worksheet.cell(1, 1)
+    assert header.font.b and header.fill.fgColor.rgb == 'FF00A84F' and header.border.left.style == 'thin', 'header style'
+    for i, col in enumerate(export_df.columns, start=1):
+        assert worksheet.cell(1, i).value == str(col), f'header {col!r}'
+        values = export_df[col]
+        if pd.api.types.is_datetime64_any_dtype(values.dtype) and values.notna().any():
+            row = int(np.flatnonzero(values.notna().to_numpy())[0])
+            cell = worksheet.cell(row + 2, i)
+            assert cell.number_format == 'mm/dd/yyyy' and cell.value == values.iloc[row], f'date column {col!r}'
+
+
+def run_size(workbook, roles, args, snapshot_dir):
+    """Benchmark every stage for one workbook; returns {stage: stats}"""
+    stages = {}
+    memory = not args.no_memory
+
+    def cold_load():
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        return load_workbook(workbook, columns='dashboard', engine=args.engine)
+
+    (summary_df, detailed_df, _), stages['load.parse'] = measure(cold_load, args.repeat, memory)
+    _, stages['load.snapshot'] = measure(
+        lambda: load_workbook(workbook, columns='dashboard', engine=args.engine), args.repeat, memory)
+
+    (summary_df, detailed_df), stages['load.prepare'] = measure(
+        lambda: (clean_summary(summary_df), prepare_detail(detailed_df)), args.repeat, memory)
+    cube, stages['metrics.cube'] = measure(lambda: MetricsCube(summary_df, detailed_df), args.repeat, memory)
+
+    # Tab 4 filtering: index build, one query per selection, then one sorted page
+    index, stages['filter.index'] = measure(lambda: FilterIndex(detailed_df), args.repeat, memory)
+    combos = filter_combinations(cube)
+    _, stages['filter.baseline'] = measure(
+        lambda: [baseline_filter(detailed_df, f) for f in combos], args.repeat, memory)
+    _, stages['filter.query'] = measure(
+        lambda: index.clear() or [index.filter(f) for f in combos], args.repeat, memory)
+    _, stages['filter.counts'] = measure(lambda: [cube.roles(f) for f in combos], args.repeat, memory)
+
+    def page():
+        rows = index.sorted_rows(combos[0], 'Target \nStart Date', False)
+        return detailed_df.take(rows[:PAGE_SIZE])
+    _, stages['filter.page'] = measure(page, args.repeat, memory)
+
+    # Exports (the two download buttons of tab 4)
+    display_df = cube.areas[['#', 'Technology Area', 'Leaders', '# of New Roles',
+                             'Est. Investment', 'Open Roles', 'Closed Roles']]
+    _, stages['export.summary'] = measure(
+        lambda: excel_bytes(export_frame(display_df), 'Summary'), args.repeat, memory)
+    if roles <= args.max_export_roles:
+        _, full_detail, _ = load_workbook(workbook, columns='full', engine=args.engine)
+        full_detail = prepare_detail(full_detail)
+        data, stages['export.detailed'] = measure(
+            lambda: excel_bytes(export_frame(full_detail), 'Detailed Roles'), args.repeat, memory)
+        check_export(data, export_frame(full_detail))
+
+    # Static HTML generator (its progress output is discarded)
+    def static_html():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_html(summary_df, detailed_df)
+    html, stages['static.generate_html'] = measure(static_html, args.repeat, memory)
+    stages['static.generate_html']['output_bytes'] = len(html.encode('utf-8'))
+    if args.chart_workers > 1:
+        # Charts fanned out over a process pool (worker start-up included, as in a real build)
+        def static_html_pool():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return generate_html(summary_df, detailed_df, workers=args.chart_workers)
+        _, stages['static.generate_html.pool'] = measure(static_html_pool, args.repeat, False)
+    return stages
+
+
+def compare(previous_file, results):
+    """Print each stage's time against a previous results file"""
+    with open(previous_file, 'r', encoding='utf-8') as f:
+        previous = {(run['roles'], run['areas'], run['snapshot_columns']): run['stages'] for run in json.load(f)['runs']}
+    print(f"\nCompared with {previous_file}")
+    for run in results['runs']:
+        before = previous.get((run['roles'], run['areas'], run['snapshot_columns']))
+        if before is None:
+            continue
+        print(f"  {run['roles']:,} roles")
+        for stage, stats in run['stages'].items():
+            if stage in before:
+                ratio = before[stage]['seconds'] / stats['seconds'] if stats['seconds'] else float('inf')
+                print(f"    {stage:<24}{before[stage]['seconds']:9.4f}s -> {stats['seconds']:9.4f}s  {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the staffing dashboard pipeline on synthetic workbooks')
+    parser.add_argument('--roles', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--areas', type=int, default=6)
+    parser.add_argument('--snapshot-columns', type=int, default=20)
+    parser.add_argument('--engine', choices=staffing_data.EXCEL_ENGINES, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-export-roles', type=int, default=200000,
+                        help='skip the detailed Excel export above this many roles')
+    parser.add_argument('--chart-workers', type=int, default=1,
+                        help='also time generate_html with its charts rendered by this many processes')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced peak-memory runs')
+    parser.add_argument('--workbook-dir', help='keep generated workbooks here and reuse them between runs')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/pipeline-<timestamp>.json)')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    args = parser.parse_args()
+
+    results = {
+        'format': RESULTS_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'engine': staffing_data.resolve_engine(args.engine),
+        },
+        'settings': {'repeat': args.repeat, 'memory': not args.no_memory},
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Snapshots go to a scratch folder so the real cache is never touched
+        snapshot_dir = os.path.join(tmp, 'snapshots')
+        staffing_data.SNAPSHOT_DIR = snapshot_dir
+        TIMER.log_path = None  # Benchmark runs stay out of the timing log
+        workbook_dir = args.workbook_dir or tmp
+        os.makedirs(workbook_dir, exist_ok=True)
+
+        for roles in args.roles:
+            workbook = os.path.join(workbook_dir, f'synthetic_{roles}_{args.areas}a_{args.snapshot_columns}c.xlsx')
+            if not os.path.exists(workbook):
+                start = time.perf_counter()
+                write_workbook(workbook, roles=roles, areas=args.areas, snapshot_columns=args.snapshot_columns)
+                print(f"Wrote {roles:,} roles in {time.perf_counter() - start:.1f}s")
+
+            stages = run_size(workbook, roles, args, snapshot_dir)
+            results['runs'].append({'roles': roles, 'areas': args.areas, 'snapshot_columns': args.snapshot_columns,
+                                    'workbook_bytes': os.path.getsize(workbook), 'stages': stages})
+
+            print(f"\n{roles:,} roles, {args.areas} areas, {args.snapshot_columns} date-stamped columns")
+            for stage, stats in stages.items():
+                peak = f"{stats['peak_bytes'] / 1024 ** 2:9.1f} MB peak" if 'peak_bytes' in stats else ''
+                print(f"  {stage:<24}{stats['seconds']:9.4f}s {peak}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Workbook Reader Benchmark
+Compares the original two-call pd.read_excel load against the single-pass, column-pruned
+reader in staffing_data on synthetic workbooks of increasing size, after checking that every
+engine reads a workbook with NA strings and numbers stored as text into identical frames
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from staffing_data import read_workbook, calamine_available, SUMMARY_SHEET, DETAIL_SHEET  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+
+
+def baseline_read(path):
+    """The original loader: one full read_excel call per sheet"""
+    summary_df = pd.read_excel(path, sheet_name=SUMMARY_SHEET, header=1)
+    detailed_df = pd.read_excel(path, sheet_name=DETAIL_SHEET, header=1, skiprows=[0])
+    return summary_df, detailed_df
+
+
+def best_time(func, repeat):
+    """Best wall-clock time of `repeat` calls"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def available_engines():
+    engines = ['openpyxl']
+    if calamine_available():
+        engines.append('calamine')
+    else:
+        print("python-calamine not installed (or pandas older than 2.2) - skipping the calamine engine")
+    return engines
+
+
+def check_engines(path, engines):
+    """Assert that all engines return identical frames (values and dtypes) for both column modes"""
+    for columns in ('full', 'dashboard'):
+        reference = read_workbook(path, columns=columns, engine=engines[0])
+        for engine in engines[1:]:
+            for expected, actual in zip(reference, read_workbook(path, columns=columns, engine=engine)):
+                pd.testing.assert_frame_equal(actual, expected)
+    print(f"Engines agree on NA strings and numeric text: {', '.join(engines)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the staffing workbook reader')
+    parser.add_argument('--roles', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--snapshot-columns', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    engines = available_engines()
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(engines) > 1:
+            path = os.path.join(tmp, 'messy.xlsx')
+            write_workbook(path, roles=500, snapshot_columns=4, messy=True)
+            check_engines(path, engines)
+
+        for roles in args.roles:
+            path = os.path.join(tmp, f'synthetic_{roles}.xlsx')
+            write_workbook(path, roles=roles, snapshot_columns=args.snapshot_columns)
+
+            baseline = best_time(lambda: baseline_read(path), args.repeat)
+            print(f"\n{roles:,} roles, {args.snapshot_columns} date-stamped columns")
+            print(f"  {'read_excel x2 (baseline)':<32}{baseline:8.3f}s")
+            for engine in engines:
+                for columns in ('full', 'dashboard'):
+                    elapsed = best_time(lambda: read_workbook(path, columns=columns, engine=engine), args.repeat)
+                    label = f'{engine} / {columns}'
+                    print(f"  {label:<32}{elapsed:8.3f}s  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
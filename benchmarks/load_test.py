@@ -0,0 +1,429 @@
+"""
+Staffing Dashboard Load Test
+Starts staffing_dashboard.py on a local Streamlit server against a synthetic workbook and drives
+it with N concurrent simulated browser sessions (websocket clients speaking Streamlit's own
+protocol), each running a realistic interaction script: tab switches, filter changes and export
+clicks. Reports per-interaction p50/p95/p99 latency, throughput, the server's RSS growth and the
+server-side stage timings of every concurrency level.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from staffing_store import process_memory  # noqa: E402
+from synthetic_workbook import write_workbook  # noqa: E402
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'staffing_dashboard.py')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+RESULTS_FORMAT = 1
+RSS_SAMPLE_SECONDS = 0.2
+SERVER_START_SECONDS = 60
+
+# Tab labels as shown by the dashboard
+TABS = {
+    'overview': "📊 Overview",
+    'technology': "🎯 Technology Areas",
+    'investment': "💰 Investment Analysis",
+    'detailed': "📋 Detailed Data",
+}
+
+
+class Session:
+    """
+    One simulated browser: a websocket session that keeps its widget values, sends them
+    with every rerun like the browser does, and parses each run's output into an element tree
+    """
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.widgets = {}  # widget id -> WidgetState, as last sent
+        self.page_hash = ''
+        self.tabs_id = None
+        self.tree = None
+        self.ws = None
+
+    async def open(self):
+        self.ws = await websockets.connect(self.url.replace('http', 'ws', 1) + '/_stcore/stream',
+                                           origin=self.url, max_size=None)
+        await self.rerun()
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, triggers=()):
+        """Send the widget values (plus any one-shot button triggers) and wait for the run to finish"""
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.widget_states.widgets.extend(list(self.widgets.values()) + list(triggers))
+        await self.ws.send(msg.SerializeToString())
+
+        deltas = []
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = forward.WhichOneof('type')
+            if kind == 'delta':
+                deltas.append(forward)
+                block = forward.delta.add_block if forward.delta.WhichOneof('type') == 'add_block' else None
+                if block is not None and block.WhichOneof('type') == 'tab_container':
+                    self.tabs_id = block.tab_container.id
+            elif kind == 'new_session':
+                self.page_hash = forward.new_session.page_script_hash
+            elif kind == 'script_finished' and forward.script_finished in (
+                    ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_WITH_COMPILE_ERROR):
+                break  # Fragment-only runs (the workbook poll) and superseded runs are not ours
+        self.tree = parse_tree_from_messages(deltas)
+        if self.tree.exception:
+            raise RuntimeError(self.tree.exception[0].message)
+
+    async def set(self, widget, value):
+        """Change one widget, as the browser does, and rerun"""
+        self.widgets[widget.id] = widget_state(widget, value)
+        await self.rerun()
+
+    async def open_tab(self, tab):
+        self.widgets[self.tabs_id] = WidgetState(id=self.tabs_id, string_value=TABS[tab])
+        await self.rerun()
+
+    async def click(self, text):
+        """Click the first download button (or button) whose label contains text; downloads are fetched"""
+        for button in list(self.tree.download_button) + list(self.tree.button):
+            if text in button.label:
+                break
+        else:
+            raise LookupError(f"No button labelled like {text!r}")
+        url = getattr(button.proto, 'url', '')
+        if url:
+            await asyncio.to_thread(fetch, self.url + url)
+        await self.rerun(triggers=[WidgetState(id=button.id, trigger_value=True)])
+
+    async def download(self, text):
+        """Download an export, first clicking its Prepare button if it hasn't been generated yet"""
+        if not any(text in button.label for button in self.tree.download_button):
+            await self.click(text)
+        await self.click(text)
+
+    def widget(self, kind, label):
+        for widget in getattr(self.tree, kind):
+            if widget.label == label:
+                return widget
+        raise LookupError(f"No {kind} labelled {label!r} (is the right tab open?)")
+
+
+def widget_state(widget, value):
+    """The WidgetState the browser sends once the user has set widget to value"""
+    state = WidgetState(id=widget.id)
+    if widget.type == 'multiselect':
+        state.string_array_value.data[:] = value
+    elif widget.type in ('selectbox', 'radio'):
+        state.string_value = value
+    elif widget.type == 'number_input':
+        if widget.proto.data_type == widget.proto.INT:
+            state.int_value = int(value)
+        else:
+            state.double_value = value
+    else:
+        raise TypeError(f"Setting a {widget.type} is not supported")
+    return state
+
+
+def fetch(url):
+    with urllib.request.urlopen(url) as response:
+        return len(response.read())
+
+
+# Interactions: each is one click in the browser (one rerun, plus the download for exports)
+
+def switch_tab(tab):
+    async def interaction(session):
+        await session.open_tab(tab)
+    interaction.__name__ = f'tab.{tab}'
+    return interaction
+
+
+async def view_by_investment(session):
+    await session.set(session.widget('radio', "View By:"), "Investment Area")
+
+
+async def view_by_technology(session):
+    await session.set(session.widget('radio', "View By:"), "Technology Area")
+
+
+async def select_area(session):
+    select = session.widget('selectbox', "Select Technology Area")
+    await session.set(select, select.options[-1])
+
+
+async def filter_status(session):
+    select = session.widget('multiselect', "Filter by Status")
+    await session.set(select, [option for option in select.options if option != 'All'][:1])
+
+
+async def filter_area(session):
+    select = session.widget('multiselect', "Filter by Technology Area")
+    await session.set(select, [option for option in select.options if option != 'All'][:2])
+
+
+async def sort_by_start(session):
+    await session.set(session.widget('selectbox', "Sort by"), "Target Start Date")
+
+
+async def next_page(session):
+    page = session.tree.number_input(key='table_page')
+    await session.set(page, min(2, page.max))
+
+
+async def clear_filters(session):
+    await session.set(session.widget('multiselect', "Filter by Status"), ['All'])
+    await session.set(session.widget('multiselect', "Filter by Technology Area"), ['All'])
+
+
+async def export_summary(session):
+    await session.download("Summary")
+
+
+async def export_detailed(session):
+    await session.download("Detailed Roles")
+
+
+SCRIPTS = {
+    'browse': [switch_tab('technology'), select_area, switch_tab('investment'), view_by_investment,
+               switch_tab('overview'), view_by_technology],
+    'filter': [switch_tab('detailed'), filter_status, filter_area, sort_by_start, next_page, clear_filters],
+    'export': [switch_tab('detailed'), export_summary, export_detailed, switch_tab('overview')],
+}
+
+
+async def run_session(number, url, args, samples, errors):
+    """Open the page, then run the session's script `iterations` times, recording (interaction, seconds)"""
+    script = args.scripts[number % len(args.scripts)]
+    for _ in range(args.iterations):
+        session = Session(url, args.timeout)
+        name = 'open_page'
+        try:
+            start = time.perf_counter()
+            await session.open()
+            samples.append((name, time.perf_counter() - start))
+            for interaction in SCRIPTS[script]:
+                if args.think:
+                    await asyncio.sleep(args.think)
+                name = interaction.__name__
+                start = time.perf_counter()
+                await interaction(session)
+                samples.append((name, time.perf_counter() - start))
+        except Exception as e:
+            errors.append({'session': number, 'script': script, 'interaction': name,
+                           'error': f'{type(e).__name__}: {e}'})
+        finally:
+            await session.close()
+
+
+async def sample_rss(pid, peak, stop):
+    while not stop.is_set():
+        peak[0] = max(peak[0], process_memory(pid) or 0)
+        try:
+            await asyncio.wait_for(stop.wait(), RSS_SAMPLE_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+
+def percentiles(seconds):
+    values = np.array(seconds) * 1000
+    return {'count': len(values), 'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)), 'p99_ms': float(np.percentile(values, 99)),
+            'max_ms': float(values.max())}
+
+
+def stage_timings(timing_log, offset):
+    """Server-side p50/p95 per timed stage from the timing log lines written after offset"""
+    stages = {}
+    if not os.path.exists(timing_log):
+        return stages
+    with open(timing_log, 'r', encoding='utf-8') as f:
+        f.seek(offset)
+        for line in f:
+            for span in json.loads(line)['spans']:
+                stages.setdefault(span['name'], []).append(span['ms'])
+    return {name: {'count': len(values), 'p50_ms': float(np.percentile(values, 50)),
+                   'p95_ms': float(np.percentile(values, 95))}
+            for name, values in sorted(stages.items())}
+
+
+async def run_level(sessions, url, server, args, timing_log):
+    """Run `sessions` concurrent sessions against the server; returns the level's results"""
+    samples, errors = [], []
+    log_offset = os.path.getsize(timing_log) if os.path.exists(timing_log) else 0
+    rss_before = process_memory(server.pid)
+    peak, stop = [rss_before or 0], asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(server.pid, peak, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(number, url, args, samples, errors) for number in range(sessions)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await sampler
+    rss_after = process_memory(server.pid)
+
+    by_interaction = {}
+    for name, seconds in samples:
+        by_interaction.setdefault(name, []).append(seconds)
+    return {
+        'sessions': sessions,
+        'wall_seconds': wall,
+        'interactions': len(samples),
+        'throughput_per_second': len(samples) / wall if wall else 0.0,
+        'latency': percentiles([seconds for _, seconds in samples]) if samples else {},
+        'by_interaction': {name: percentiles(values) for name, values in sorted(by_interaction.items())},
+        'server_stages': stage_timings(timing_log, log_offset),
+        'rss': {'before': rss_before, 'after': rss_after, 'peak': peak[0] or None,
+                'growth': rss_after - rss_before if rss_after and rss_before else None},
+        'errors': errors,
+    }
+
+
+def print_level(level):
+    mb = 1024 ** 2
+    rss = level['rss']
+    print(f"\n{level['sessions']} concurrent session(s): {level['interactions']} interactions in "
+          f"{level['wall_seconds']:.1f}s ({level['throughput_per_second']:.2f}/s), {len(level['errors'])} error(s)")
+    if rss['before'] and rss['after']:
+        print(f"  Server RSS {rss['before'] / mb:,.0f} MB -> {rss['after'] / mb:,.0f} MB "
+              f"(peak {rss['peak'] / mb:,.0f} MB, growth {rss['growth'] / mb:+,.0f} MB)")
+    print(f"  {'interaction':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in list(level['by_interaction'].items()) + [('(all)', level['latency'])]:
+        if stats:
+            print(f"  {name:<22}{stats['count']:>7}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}{stats['p99_ms']:>10.0f}")
+    for error in level['errors'][:5]:
+        print(f"  ! session {error['session']} ({error['script']}) {error['interaction']}: {error['error']}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, env, log_file):
+    """Start the dashboard on a headless Streamlit server and wait until it answers"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', DASHBOARD, '--server.headless', 'true',
+         '--server.port', str(port), '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    deadline = time.time() + SERVER_START_SECONDS
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Streamlit exited with code {server.returncode}")
+        try:
+            fetch(f'http://localhost:{port}/_stcore/health')
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"Streamlit did not start within {SERVER_START_SECONDS}s")
+
+
+async def run(args, url, server, timing_log, results):
+    if not args.no_warmup:
+        # One session through every script fills the process-wide caches, as on a server that has been up a while
+        start, errors = time.perf_counter(), []
+        for number in range(len(args.scripts)):
+            await run_session(number, url, argparse.Namespace(**{**vars(args), 'iterations': 1, 'think': 0.0}),
+                              [], errors)
+        results['warmup'] = {'seconds': time.perf_counter() - start, 'errors': errors}
+        print(f"Warm-up: {results['warmup']['seconds']:.1f}s, {len(errors)} error(s)")
+        for error in errors[:5]:
+            print(f"  ! {error['script']} {error['interaction']}: {error['error']}")
+
+    for sessions in args.sessions:
+        level = await run_level(sessions, url, server, args, timing_log)
+        results['levels'].append(level)
+        print_level(level)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the staffing dashboard with concurrent simulated sessions')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 20],
+                        help='concurrent sessions per level (levels run one after another)')
+    parser.add_argument('--scripts', nargs='+', choices=list(SCRIPTS), default=list(SCRIPTS),
+                        help='interaction scripts, assigned to sessions round-robin')
+    parser.add_argument('--iterations', type=int, default=2, help='times each session opens the page and runs its script')
+    parser.add_argument('--think', type=float, default=0.0, help='seconds between interactions')
+    parser.add_argument('--timeout', type=float, default=300, help='seconds allowed for one rerun')
+    parser.add_argument('--roles', type=int, default=10000)
+    parser.add_argument('--areas', type=int, default=6)
+    parser.add_argument('--snapshot-columns', type=int, default=20)
+    parser.add_argument('--workbook', help='existing workbook to test against instead of a synthetic one')
+    parser.add_argument('--port', type=int, help='server port (default: any free port)')
+    parser.add_argument('--no-warmup', action='store_true', help='measure the first level with cold caches')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/load-<timestamp>.json)')
+    args = parser.parse_args()
+
+    results = {
+        'format': RESULTS_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'streamlit': streamlit.__version__,
+            'pandas': pd.__version__,
+        },
+        'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+        'levels': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = args.workbook
+        if workbook is None:
+            workbook = os.path.join(tmp, 'synthetic.xlsx')
+            write_workbook(workbook, roles=args.roles, areas=args.areas, snapshot_columns=args.snapshot_columns)
+        results['workbook_bytes'] = os.path.getsize(workbook)
+
+        # Snapshots, history and the timing log go to a scratch folder so the real cache is never touched
+        timing_log = os.path.join(tmp, 'timing.jsonl')
+        env = {**os.environ, 'STAFFING_WORKBOOK': os.path.abspath(workbook),
+               'STAFFING_SNAPSHOT_DIR': os.path.join(tmp, 'snapshots'),
+               'STAFFING_HISTORY_DIR': os.path.join(tmp, 'history'),
+               'STAFFING_TIMING_LOG': timing_log}
+        port = args.port or free_port()
+        with open(os.path.join(tmp, 'server.log'), 'w') as log_file:
+            server = start_server(port, env, log_file)
+            try:
+                asyncio.run(run(args, f'http://localhost:{port}', server, timing_log, results))
+            finally:
+                server.terminate()
+                server.wait()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
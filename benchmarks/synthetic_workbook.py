@@ -0,0 +1,134 @@
+"""
+Synthetic Staffing Workbook Generator
+Writes workbooks with the same sheet names and header layout as the real staffing plan,
+so the loading and export paths can be measured without the OneDrive file
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from staffing_data import SUMMARY_SHEET, DETAIL_SHEET  # noqa: E402
+
+AREA_NAMES = ['Platform Engineering', 'Data & Analytics', 'Security', 'Product Engineering',
+              'Infrastructure', 'Quality Engineering', 'Enterprise Apps', 'AI & Automation']
+STATUSES = ['Open', 'Closed', 'On Hold']
+RECRUITMENT_STATUSES = ['Sourcing', 'Interviewing', 'Offer Extended', None]
+LOCATIONS = ['United States', 'India', 'United Kingdom', 'Philippines', 'Poland']
+WORKER_TYPES = ['FTE', 'Contractor']
+
+DETAIL_HEADER = ['Technology Area', 'TEAM NAME', 'Worker Type', 'Req ID', 'Recruitment Status',
+                 'Location', 'Senior Leader', 'Hiring Manager', 'Target \nStart Date',
+                 'Target \nEnd Date', 'Actual Start', 'Actual End Date', 'Status', 'Comment',
+                 'Est. Blended Hourly Rate', 'Est. Forecast']
+
+
+def area_names(count):
+    """Return `count` Technology Area names"""
+    return [AREA_NAMES[i] if i < len(AREA_NAMES) else f'Technology Area {i + 1}' for i in range(count)]
+
+
+def write_workbook(path, roles=10000, areas=6, snapshot_columns=20, seed=0, messy=False):
+    """
+    Write a synthetic staffing workbook.
+
+    roles: rows in the detail sheet; areas: number of Technology Areas;
+    snapshot_columns: number of date-stamped status columns to the right of the detail data;
+    messy: also write NA strings ('N/A', 'NA', 'null') and space-padded numbers stored as text.
+    """
+    rng = random.Random(seed)
+    names = area_names(areas)
+    per_area = {name: {'roles': 0, 'closed': 0, 'investment': 0.0} for name in names}
+
+    wb = Workbook(write_only=True)
+
+    # Detail sheet first so the summary totals can be derived from it
+    detail = wb.create_sheet(DETAIL_SHEET)
+    detail.append(['Global Technology 2026 Staffing Rampup Plan'])
+    detail.append(['Detailed 2026 Staffing Plans'])
+    snapshot_headers = [datetime(2025, 9, 1) + timedelta(days=7 * i) for i in range(snapshot_columns)]
+    if snapshot_headers:
+        # The real workbook also carries ISO timestamp headers, e.g. "2025-12-09T15:45:19z"
+        snapshot_headers[-1] = snapshot_headers[-1].strftime('%Y-%m-%dT%H:%M:%Sz')
+    detail.append(DETAIL_HEADER + snapshot_headers)
+
+    start = datetime(2026, 1, 5)
+    for i in range(roles):
+        area = names[rng.randrange(areas)]
+        status = rng.choices(STATUSES, weights=[6, 3, 1])[0]
+        per_area[area]['roles'] += 1
+        if status == 'Closed':
+            per_area[area]['closed'] += 1
+
+        forecast = round(rng.uniform(40000, 250000), 2)
+        per_area[area]['investment'] += forecast
+        target_start = start + timedelta(days=rng.randrange(0, 330))
+        actual_start = target_start + timedelta(days=rng.randrange(0, 30)) if status == 'Closed' else None
+        rate = round(rng.uniform(35, 140), 2)
+        row = [
+            area,
+            f'{area} Team {rng.randrange(1, 9)}',
+            rng.choice(WORKER_TYPES),
+            # A few rows have numeric or missing Req IDs, as in the real sheet
+            None if i % 97 == 0 else (100000 + i if i % 11 == 0 else f'REQ-{100000 + i}'),
+            rng.choice(RECRUITMENT_STATUSES) if status != 'Closed' else 'Filled',
+            rng.choice(LOCATIONS),
+            f'Senior Leader {names.index(area) + 1}',
+            f'Hiring Manager {rng.randrange(1, 4 * areas + 1)}',
+            target_start,
+            datetime(2026, 12, 31),
+            actual_start,
+            None,
+            status,
+            'Backfill' if i % 13 == 0 else None,
+            rate,
+            forecast,
+        ] + [rng.choice(STATUSES) for _ in range(snapshot_columns)]
+        if messy:
+            if i % 7 == 0:
+                row[3] = 'null'
+            if i % 5 == 0:
+                row[4] = 'N/A'
+            if i % 9 == 0:
+                row[13] = 'NA'
+            if i % 3 == 0:
+                row[14] = f' {rate} '
+        detail.append(row)
+
+    summary = wb.create_sheet(SUMMARY_SHEET, 0)
+    summary.append(['Technology Staffing Summary'])
+    summary.append(['#', 'Technology Area', 'Leaders', '# of New Roles', 'Est. Investment',
+                    'Open Roles', 'Closed Roles', 'Investment Area'])
+    for i, name in enumerate(names):
+        counts = per_area[name]
+        summary.append([i + 1, name, f'Senior Leader {i + 1}', counts['roles'],
+                        round(counts['investment'], 2), counts['roles'] - counts['closed'], counts['closed'], None])
+    # Totals and investment-area rows below the technology areas, as in the real sheet
+    summary.append([None, 'Total', None, roles, round(sum(c['investment'] for c in per_area.values()), 2),
+                    None, None, None])
+    summary.append([None, None, None, None, None, None, None, None])
+    summary.append([areas + 1, 'Investment Areas', None, None, None, None, None, 'AI Enablement'])
+
+    wb.save(path)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a synthetic staffing workbook')
+    parser.add_argument('path')
+    parser.add_argument('--roles', type=int, default=10000)
+    parser.add_argument('--areas', type=int, default=6)
+    parser.add_argument('--snapshot-columns', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--messy', action='store_true', help='Include NA strings and numbers stored as text')
+    args = parser.parse_args()
+
+    write_workbook(args.path, args.roles, args.areas, args.snapshot_columns, args.seed, args.messy)
+    print(f"Wrote {args.roles:,} roles to {args.path}")
@@ -0,0 +1,191 @@
+"""
+Generate Per-Slice Staffing Reports
+Headless batch export: one branded report per Technology Area, Senior Leader and Hiring Manager,
+written into an output folder with a manifest. The workbook (its snapshot, when unchanged) is
+loaded once and the slices are fanned out across a process pool; every report uses the same
+formatting as the dashboard's exports.
+
+    python generate_reports.py --output reports --format xlsx csv
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from staffing_data import FILE_PATH, load_workbook, prepare_detail, version_key, isin_mask, ColumnMap
+from staffing_export import export_frame, workbook_bytes, csv_bytes
+from staffing_metrics import area_summary
+from staffing_timing import TIMER
+
+# Detail-sheet columns a report can be sliced by, and the folder each slice goes into
+SLICE_COLUMNS = {
+    'Technology Area': 'technology_area',
+    'Senior Leader': 'senior_leader',
+    'Hiring Manager': 'hiring_manager',
+}
+REPORT_FORMATS = ('xlsx', 'csv')
+MANIFEST_FILE = 'manifest.json'
+# Slices handed to a worker process at a time
+SLICES_PER_TASK = 8
+
+# Set in each worker process by _init_worker: the full detail frame and its column map
+_detail = None
+_columns = None
+
+
+def _init_worker(detailed_df, columns):
+    global _detail, _columns
+    _detail, _columns = detailed_df, columns
+
+
+def slug(value):
+    """File-name-safe version of a slice value, e.g. 'Data & Analytics' -> 'Data_Analytics'"""
+    return re.sub(r'[^\w.-]+', '_', str(value)).strip('_.') or 'blank'
+
+
+def slice_values(detailed_df, column):
+    """Values of a slice column that have at least one role, in sorted order"""
+    values = detailed_df[column].dropna()
+    return sorted({str(value) for value in values if str(value).strip()})
+
+
+def write_report(column, value, path, formats):
+    """
+    Write the report(s) of one slice - the roles whose `column` equals value - to path + '.<format>'
+    and return one manifest entry per file
+    """
+    rows = _detail[isin_mask(_detail[column], [value])]
+    entries = []
+    for report_format in formats:
+        if report_format == 'xlsx':
+            data = workbook_bytes({'Roles': export_frame(rows, _columns),
+                                   'Technology Areas': export_frame(area_summary(rows))})
+        else:
+            data = csv_bytes(export_frame(rows, _columns))
+        file_name = f'{path}.{report_format}'
+        with open(file_name, 'wb') as f:
+            f.write(data)
+        entries.append({'slice': column, 'value': value, 'format': report_format, 'roles': len(rows),
+                        'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest(), 'file': file_name})
+    return entries
+
+
+def _write_reports(tasks):
+    """Worker entry point: write a batch of (column, value, path, formats) slices"""
+    return [entry for task in tasks for entry in write_report(*task)]
+
+
+def plan_reports(detailed_df, output_dir, slices):
+    """(column, value, path without extension) for every slice, with unique file names per folder"""
+    plan = []
+    for column in slices:
+        if column not in detailed_df.columns:
+            print(f"  ⚠️ Detailed sheet has no '{column}' column - skipped")
+            continue
+        folder = os.path.join(output_dir, SLICE_COLUMNS[column])
+        os.makedirs(folder, exist_ok=True)
+        used = set()
+        for value in slice_values(detailed_df, column):
+            name = slug(value)
+            while name.lower() in used:  # Distinct values can share a slug ('R&D' and 'R D')
+                name += '_'
+            used.add(name.lower())
+            plan.append((column, value, os.path.join(folder, name)))
+    return plan
+
+
+def remove_stale(output_dir, entries):
+    """Delete reports listed in the previous manifest that this run didn't produce"""
+    previous = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(previous):
+        return 0
+    try:
+        with open(previous, 'r', encoding='utf-8') as f:
+            old_files = {os.path.join(output_dir, report['file']) for report in json.load(f).get('reports', [])}
+    except (OSError, ValueError, KeyError, TypeError):
+        return 0
+    stale = old_files - {os.path.join(output_dir, entry['file']) for entry in entries}
+    for file_name in stale:
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+    return len(stale)
+
+
+def generate_reports(detailed_df, output_dir, slices=tuple(SLICE_COLUMNS), formats=('xlsx',), workers=None):
+    """Write every slice's reports into output_dir and return the manifest entries (paths relative to it)"""
+    columns = ColumnMap(detailed_df)
+    plan = plan_reports(detailed_df, output_dir, slices)
+    tasks = [(column, value, path, tuple(formats)) for column, value, path in plan]
+    batches = [tasks[i:i + SLICES_PER_TASK] for i in range(0, len(tasks), SLICES_PER_TASK)]
+
+    entries = []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) <= 1:
+        _init_worker(detailed_df, columns)
+        for batch in batches:
+            entries.extend(_write_reports(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(detailed_df, columns)) as pool:
+            for batch_entries in pool.map(_write_reports, batches):
+                entries.extend(batch_entries)
+
+    for entry in entries:
+        entry['file'] = os.path.relpath(entry['file'], output_dir).replace(os.sep, '/')
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write one staffing report per Technology Area, Senior Leader "
+                                                 "and Hiring Manager")
+    parser.add_argument('--workbook', default=FILE_PATH)
+    parser.add_argument('--output', default='reports', help="output folder (default: reports)")
+    parser.add_argument('--by', nargs='+', choices=list(SLICE_COLUMNS), default=list(SLICE_COLUMNS),
+                        help="slice columns (default: all)")
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=['xlsx'], dest='formats',
+                        help="report formats (default: xlsx)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU, 1 = no pool)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("GENERATING STAFFING REPORTS")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    with TIMER.span('reports'):
+        with TIMER.span('reports.load'):
+            _, detailed_df, version = load_workbook(args.workbook, columns='full')
+            detailed_df = prepare_detail(detailed_df)
+        print(f"Loaded {len(detailed_df):,} detailed rows (data version {version_key(version)})")
+
+        os.makedirs(args.output, exist_ok=True)
+        with TIMER.span('reports.write'):
+            entries = generate_reports(detailed_df, args.output, args.by, args.formats, args.workers)
+        removed = remove_stale(args.output, entries)
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'workbook': os.path.basename(args.workbook),
+        'data_version': version_key(version),
+        'slices': args.by,
+        'formats': args.formats,
+        'reports': entries,
+    }
+    with open(os.path.join(args.output, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    slices = len({(entry['slice'], entry['value']) for entry in entries})
+    print(f"\n✅ Wrote {len(entries):,} report file(s) for {slices:,} slices to {args.output} "
+          f"in {time.perf_counter() - started:.1f}s" + (f", removed {removed} stale" if removed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,31 @@
 """
 Generate Static HTML Dashboard for GitHub Pages
-Converts the Streamlit dashboard to a static HTML file with the same visualizations
+Converts the Streamlit dashboard to a static HTML file with the same visualizations.
+The build is content-addressed: the page carries a hash of its inputs (workbook content,
+template and chart code, library versions), an unchanged build is skipped, and the same
+inputs always produce the same bytes.
 """
 
+import argparse
+import hashlib
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
 import pandas as pd
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
-import json
+import plotly.io as pio
+
+import staffing_data
+import staffing_metrics
+from staffing_data import FILE_PATH, load_workbook, clean_summary, prepare_detail, version_key, workbook_version
+from staffing_metrics import area_summary, plan_totals, cross_check
+from staffing_timing import TIMER
 
 # First Advantage Brand Colors
 FA_GREEN = "#00a84f"
@@ -18,31 +36,70 @@ FA_GRAY = "#6b7280"
 FA_LIGHT_GRAY = "#f8f9fa"
 FA_WARNING = "#f5a623"
 
-# File path
-FILE_PATH = r'C:\Users\Eric.Jaffe\OneDrive - First Advantage Corporation\2026 Budget\Global Technology 2026 Staffing Rampup Plan 011226 v2.0.xlsx'
+# Serialize figures with orjson when it's installed (several times faster than the json module)
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
 
-def load_data():
-    """Load data from Excel file"""
-    print("Loading data from Excel...")
-    
-    # Load summary data
-    summary_df = pd.read_excel(FILE_PATH, sheet_name='Technology Staffing Summary', header=1)
-    if '#' in summary_df.columns:
-        summary_df = summary_df[summary_df['#'].notna()]
-    
-    # Limit to first 6 rows to avoid double-counting (Excel has summary rows at bottom)
-    summary_df = summary_df.head(6)
-    
-    # Convert numeric columns
-    numeric_cols = ['# of New Roles', 'Est. Investment', 'Open Roles', 'Closed Roles']
-    for col in numeric_cols:
-        if col in summary_df.columns:
-            summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce').fillna(0)
+# Chart rendering pool size. The default renders inline: each worker process re-imports pandas and
+# Plotly (a second or more under the spawn start method Windows uses), which the page's five charts
+# never win back - raise it only for builds with many charts on a multi-core machine
+# (benchmarks/bench_pipeline.py --chart-workers measures both)
+CHART_WORKERS = int(os.environ.get('STAFFING_CHART_WORKERS', 0)) or 1
+
+# Bump when the page changes in a way the hashed sources don't capture
+BUILD_FORMAT = 1
+# Sources whose code shapes the page: this template and its chart options, metrics, loading
+BUILD_SOURCES = [os.path.abspath(__file__), staffing_metrics.__file__, staffing_data.__file__]
+BUILD_META_RE = re.compile(r'<meta name="staffing-build" content="([0-9a-f]+)">')
+
+# Save time Excel records in the workbook's document properties
+CORE_MODIFIED_RE = re.compile(rb'<dcterms:modified[^>]*>([^<]+)</dcterms:modified>')
+
+def last_updated(path):
+    """
+    When the workbook was last saved according to its own document properties (UTC), or None.
+    The date is part of the file's content, so a copy or sync that only touches the file's
+    modification time leaves it - and the page - unchanged.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            match = CORE_MODIFIED_RE.search(archive.read('docProps/core.xml'))
+        saved = datetime.fromisoformat(match.group(1).decode('ascii').strip().replace('Z', '+00:00'))
+    except (OSError, KeyError, AttributeError, ValueError, zipfile.BadZipFile):
+        return None
+    return saved.strftime('%Y-%m-%d %I:%M %p UTC')
+
+def build_key(version):
+    """Content hash of everything the page is built from: the workbook's content and the build code"""
+    digest = hashlib.sha256()
+    digest.update(f'format {BUILD_FORMAT}|data {version.sha256}|'
+                  f'plotly {plotly.__version__}|pandas {pd.__version__}|json {pio.json.config.default_engine}'.encode('utf-8'))
+    for path in BUILD_SOURCES:
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def built_key(output_file):
+    """Build key stamped into an existing page (None when there is no page or no stamp)"""
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            match = BUILD_META_RE.search(f.read(4096))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+@TIMER.timed('static.load')
+def load_data(version=None):
+    """Load data from the workbook snapshot (re-parses the Excel file only when it changed)"""
+    print("Loading data...")
     
-    # Load detailed data
-    detailed_df = pd.read_excel(FILE_PATH, sheet_name='Detailed 2026 Staffing Plans', header=1, skiprows=[0])
+    summary_df, detailed_df, version = load_workbook(FILE_PATH, version=version)
+    summary_df, detailed_df = clean_summary(summary_df), prepare_detail(detailed_df)
     
-    print(f"Loaded {len(summary_df)} summary rows and {len(detailed_df)} detailed rows")
+    print(f"Loaded {len(summary_df)} summary rows and {len(detailed_df)} detailed rows (data version {version_key(version)})")
     return summary_df, detailed_df
 
 def create_gauge_chart(value, total, title):
@@ -233,74 +290,81 @@ def create_scatter_chart(df, x, y, size, title):
     
     return fig.to_html(include_plotlyjs=False, div_id=title.replace(' ', '_'))
 
-def generate_html(summary_df, detailed_df):
-    """Generate the complete HTML dashboard"""
-    
-    print("Calculating metrics...")
-    
-    # Calculate overall metrics from detailed data for accurate counts
-    if 'Recruitment Status' in detailed_df.columns:
-        # Count all non-"Filled" statuses as open
-        open_roles = len(detailed_df[detailed_df['Recruitment Status'].notna()])
-        closed_roles = len(detailed_df) - open_roles
-        total_roles = len(detailed_df)
-    else:
-        # Fallback to summary data
-        total_roles = int(summary_df['# of New Roles'].sum())
-        open_roles = int(summary_df['Open Roles'].sum())
-        closed_roles = int(summary_df['Closed Roles'].sum())
-    
-    total_investment = summary_df['Est. Investment'].sum()
-    avg_cost = total_investment / total_roles if total_roles > 0 else 0
-    fill_rate = (closed_roles / total_roles * 100) if total_roles > 0 else 0
-    
-    print("Creating charts...")
-    
-    # Create recruitment status pie chart
-    status_data = pd.Series({
-        'Open (Recruiting)': open_roles,
-        'Closed (Filled)': closed_roles
-    })
-    
-    recruitment_pie = create_pie_chart(status_data, 'Recruitment Status')
-    
-    # Create roles filled gauge
-    gauge_html = create_gauge_chart(closed_roles, total_roles, f'Roles Filled ({fill_rate:.1f}%)')
-    
-    # Technology areas - horizontal bar chart (sorted descending)
-    tech_df_sorted = summary_df.nlargest(6, '# of New Roles')[['Technology Area', '# of New Roles']].sort_values('# of New Roles', ascending=True)
-    tech_horizontal_bar = create_horizontal_bar_chart(
-        tech_df_sorted,
-        '# of New Roles',
-        'Technology Area',
-        'New Roles by Technology Area',
-        FA_GREEN
-    )
-    
-    # Investment distribution pie chart
-    investment_pie = create_investment_pie_chart(
-        summary_df.head(6),
-        'Investment Distribution by Technology Area'
-    )
-    
-    # Investment scatter plot
-    investment_scatter = create_scatter_chart(
-        summary_df,
-        'Technology Area',
-        'Est. Investment',
-        '# of New Roles',
-        'Investment vs. Technology Area'
-    )
+def _render_chart(job):
+    """Worker entry point: build one chart and return its HTML"""
+    create_chart, args = job
+    return create_chart(*args)
+
+def render_charts(jobs, workers=None):
+    """
+    Build and serialize (chart function, args) jobs, fanned out across a process pool when more
+    than one worker is available. Results come back in job order and each chart's HTML depends only on its
+    arguments, so the page is the same whatever the worker count.
+    """
+    workers = min(workers or CHART_WORKERS, len(jobs))
+    if workers <= 1:
+        return [_render_chart(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_chart, jobs, chunksize=-(-len(jobs) // workers)))
+
+@TIMER.timed('static.generate_html')
+def generate_html(summary_df, detailed_df, version=None, build=None, workers=None, updated=None):
+    """
+    Generate the complete HTML dashboard. updated (the workbook's saved date, see last_updated)
+    and version (the rendered data version) are shown in the footer and build (the build key)
+    stamped into the page; none of them depends on the clock or the file's modification time,
+    so the same workbook content always gives the same page. workers sets the chart rendering
+    pool size.
+    """
+    
+    with TIMER.span('static.metrics'):
+        print("Calculating metrics...")
+    
+        # Per-area and overall totals come from the detail sheet (the same engine as the dashboard);
+        # the summary sheet is only cross-checked
+        areas_df = area_summary(detailed_df, summary_df)
+        for issue in cross_check(areas_df, summary_df):
+            print(f"  ⚠️ {issue}")
+        totals = plan_totals(detailed_df, areas_df)
+        total_roles, open_roles, closed_roles = totals['total_roles'], totals['total_open'], totals['total_closed']
+        total_investment, avg_cost, fill_rate = totals['total_investment'], totals['avg_cost'], totals['close_rate']
+    
+    with TIMER.span('static.charts'):
+        print("Creating charts...")
+    
+        # Recruitment status pie chart
+        status_data = pd.Series({
+            'Open (Recruiting)': open_roles,
+            'Closed (Filled)': closed_roles
+        })
+    
+        # Technology areas - horizontal bar chart (sorted descending)
+        tech_df_sorted = areas_df[['Technology Area', '# of New Roles']].sort_values('# of New Roles', ascending=True)
+    
+        (recruitment_pie, gauge_html, tech_horizontal_bar, investment_pie, investment_scatter) = render_charts([
+            (create_pie_chart, (status_data, 'Recruitment Status')),
+            # Roles filled gauge
+            (create_gauge_chart, (closed_roles, total_roles, f'Roles Filled ({fill_rate:.1f}%)')),
+            (create_horizontal_bar_chart, (tech_df_sorted, '# of New Roles', 'Technology Area',
+                                           'New Roles by Technology Area', FA_GREEN)),
+            # Investment distribution pie chart
+            (create_investment_pie_chart, (areas_df, 'Investment Distribution by Technology Area')),
+            # Investment scatter plot
+            (create_scatter_chart, (areas_df, 'Technology Area', 'Est. Investment', '# of New Roles',
+                                    'Investment vs. Technology Area')),
+        ], workers)
     
     print("Generating HTML...")
     
     # Generate HTML
-    html_content = f"""
+    with TIMER.span('static.html'):
+        html_content = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    {f'<meta name="staffing-build" content="{build}">' if build else ''}
     <title>First Advantage | Global Technology 2026 Staffing Dashboard</title>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
     <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
@@ -525,7 +589,8 @@ def generate_html(summary_df, detailed_df):
         </div>
         
         <div class="last-updated">
-            Last Updated: {datetime.now().strftime('%Y-%m-%d %I:%M %p')}
+            Last Updated: {updated or 'n/a'}
+            {f'(data version {version_key(version)})' if version is not None else ''}
         </div>
     </div>
 </body>
@@ -536,23 +601,38 @@ def generate_html(summary_df, detailed_df):
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Generate the static HTML dashboard")
+    parser.add_argument('--output', default='index.html', help="page to write (default: index.html)")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the inputs are unchanged")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="chart rendering processes (default: 1 = render inline)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("GENERATING STATIC HTML DASHBOARD")
     print("=" * 60)
     
     try:
-        # Load data
-        summary_df, detailed_df = load_data()
+        # Hash the inputs first: an unchanged build needs neither the data nor the charts
+        version = workbook_version(FILE_PATH)
+        build = build_key(version)
+        if not args.force and built_key(args.output) == build:
+            print(f"\n✅ {args.output} is up to date (data version {version_key(version)}, build {build[:12]}) - nothing to do")
+            return
         
-        # Generate HTML
-        html_content = generate_html(summary_df, detailed_df)
+        # Load data and generate HTML (timed as one 'static' run in the timing log)
+        with TIMER.span('static'):
+            summary_df, detailed_df = load_data(version)
+            html_content = generate_html(summary_df, detailed_df, version, build, args.workers,
+                                         last_updated(FILE_PATH))
         
-        # Write to file
-        output_file = 'index.html'
-        with open(output_file, 'w', encoding='utf-8') as f:
+        # Write to file (replaced in one step, so a half-written page is never served)
+        output_file = args.output
+        with open(output_file + '.tmp', 'w', encoding='utf-8', newline='\n') as f:
             f.write(html_content)
+        os.replace(output_file + '.tmp', output_file)
         
-        print(f"\n✅ SUCCESS! Dashboard generated: {output_file}")
+        print(f"\n✅ SUCCESS! Dashboard generated: {output_file} (build {build[:12]})")
         print("\nNext steps:")
         print("1. Copy index.html to your GitHub repo")
         print("2. Commit and push to GitHub")
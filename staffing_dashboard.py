@@ -8,7 +8,26 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+import time
+from contextlib import nullcontext
 import numpy as np
+import os
+
+from staffing_data import FILE_PATH, load_workbook, latest_snapshot, version_key, clean_summary, prepare_detail, check_schema, WorkbookWatcher, ColumnMap, DATE
+from staffing_store import SnapshotStore, DataStore, object_bytes, process_memory, format_age, format_bytes
+from staffing_ingest import IncrementalIngester
+from staffing_history import HistoryStore
+from staffing_metrics import MetricsCube, area_summary
+from staffing_index import FilterIndex, FILTER_COLUMNS
+from staffing_figures import FigureCache
+from staffing_export import ExportCache, EXPORT_FORMATS, XLSX_MIME, export_frame, excel_bytes, export_bytes
+from staffing_timing import TIMER
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Loaded frames are shared by every session; copy-on-write keeps derived frames from
+# modifying them (always on from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
 
 # Page configuration
 st.set_page_config(
@@ -198,146 +217,285 @@ st.markdown(f"""
     </style>
 """, unsafe_allow_html=True)
 
-# File path
-FILE_PATH = r'C:\Users\Eric.Jaffe\OneDrive - First Advantage Corporation\2026 Budget\Global Technology 2026 Staffing Rampup Plan 011226.xlsx'
+# Excel parsing engine: 'auto', 'openpyxl' or 'calamine' (None = STAFFING_EXCEL_ENGINE env var, default 'auto')
+EXCEL_ENGINE = None
 
-@st.cache_data
-def load_data():
-    """Load data from Excel file"""
-    try:
-        # Load summary data
-        summary_df = pd.read_excel(FILE_PATH, sheet_name='Technology Staffing Summary', header=1)
-        if '#' in summary_df.columns:
-            summary_df = summary_df[summary_df['#'].notna()]  # Remove empty rows
-        
-        # Convert numeric columns to proper types
-        numeric_cols = ['# of New Roles', 'Est. Investment', 'Open Roles', 'Closed Roles']
-        for col in numeric_cols:
-            if col in summary_df.columns:
-                summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce').fillna(0)
-        
-        # Load detailed data - header is in row 2 (0-indexed row 1)
-        detailed_df = pd.read_excel(FILE_PATH, sheet_name='Detailed 2026 Staffing Plans', header=1, skiprows=[0])
-        # Remove empty rows
-        if 'Technology Area' in detailed_df.columns:
-            detailed_df = detailed_df[detailed_df['Technology Area'].notna()].copy()
-            # Convert date columns to strings to avoid conversion issues
-            date_cols = ['Target \\nStart Date', 'Target \\nEnd Date', 'Actual Start', 'Actual End Date']
-            for col in date_cols:
-                if col in detailed_df.columns:
-                    detailed_df[col] = detailed_df[col].astype(str)
-        
-        return summary_df, detailed_df
-    except Exception as e:
-        st.error(f"Error loading file: {e}")
-        st.info("Please make sure the Excel file is closed and try refreshing the page.")
-        import traceback
-        st.error(traceback.format_exc())
-        return None, None
+# Build only the tab being viewed (switching tabs then reruns the page instead of being instant)
+LAZY_TABS = True
 
-def main():
-    # Auto-refresh data every 15 minutes
-    if 'last_refresh' not in st.session_state:
-        st.session_state.last_refresh = datetime.now()
-    
-    # Check if 15 minutes have passed
-    time_since_refresh = (datetime.now() - st.session_state.last_refresh).total_seconds()
-    if time_since_refresh > 900:  # 900 seconds = 15 minutes
-        st.cache_data.clear()
-        st.session_state.last_refresh = datetime.now()
-        st.rerun()
-    
-    # Header with First Advantage Branding
-    col1, col2 = st.columns([1, 5])
-    with col1:
+# Page sizes offered for the detailed roles table
+TABLE_PAGE_SIZES = [50, 100, 250, 500]
+
+# How often an open page checks the workbook for changes (seconds)
+VERSION_POLL_SECONDS = 60
+
+# Interval of the per-session cache wipe this dashboard used to do; an unchanged check after this long
+# (or a Refresh click) is what would have re-read the workbook, and counts as a reload avoided
+LEGACY_REFRESH_SECONDS = 15 * 60
+
+@st.cache_resource
+def get_watcher():
+    """Process-wide workbook watcher shared by every session"""
+    return WorkbookWatcher(FILE_PATH)
+
+@st.cache_resource
+def get_ingester():
+    """Process-wide incremental ingester: re-types only the detail rows that changed between versions"""
+    return IncrementalIngester()
+
+@st.cache_resource
+def get_history():
+    """Process-wide append-only history of workbook versions (per-role changes and per-area rollups)"""
+    return HistoryStore()
+
+@TIMER.timed('load.workbook')
+def read_data(version=None, ingester=None, history=None):
+    """
+    Read the dashboard columns for a workbook version (uncached; raises while the workbook is unreadable).
+    Returns (version, (summary_df, detailed_df, schema_issues)).
+    """
+    summary_df, detailed_df, version = load_workbook(FILE_PATH, version=version, columns='dashboard',
+                                                     engine=EXCEL_ENGINE, ingester=ingester)
+    if history is not None and ingester is not None and ingester.version == version:
         try:
-            st.image(r"C:\Users\Eric.Jaffe\OneDrive - First Advantage Corporation\Desktop\partner-FirstAdvantage-logo-1.png", width=150)
-        except:
-            pass  # Hide fallback text
-    
-    with col2:
-        st.markdown(f"""
-            <div style='padding-top: 20px;'>
-                <h1 style='color: {FA_GREEN}; margin-bottom: 0; font-weight: 700;'>Global Technology 2026 Staffing Dashboard</h1>
-            </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("<hr style='margin-top: 10px; margin-bottom: 30px; border-color: #00a84f;'>", unsafe_allow_html=True)
-    
-    # Load data
-    summary_df, detailed_df = load_data()
-    
-    if summary_df is None:
-        return
+            history.record(version, ingester.frame, ingester.keys, ingester.last_changes)
+        except Exception as e:
+            # History only feeds the trend chart - a failed write must not make the workbook look unreadable
+            print(f"Warning: could not record workbook version {version_key(version)} in the history store: {e}")
+    summary_df, detailed_df = clean_summary(summary_df), prepare_detail(detailed_df)
+    return version, (summary_df, detailed_df, check_schema(summary_df, detailed_df))
+
+@st.cache_resource
+def get_data_store():
+    """Process-wide read-only data for the two most recent workbook versions, shared by every session"""
+    return DataStore(max_versions=2)
+
+def shared(name, version, loader, spinner=None):
+    """Data `name` for a workbook version from the shared store, loaded once per process"""
+    store = get_data_store()
+    data = store.peek(name, version)
+    if data is None:
+        with st.spinner(spinner) if spinner else nullcontext():
+            data = store.get(name, version, loader)
+    return data
+
+def load_data(version):
+    """
+    Load the dashboard columns for one workbook version (re-parses the Excel file only when it changed).
+    Returns (summary_df, detailed_df, schema_issues); the schema is checked once per version.
+    """
+    return shared('dashboard', version, lambda: read_data(version, get_ingester(), get_history())[1],
+                  "Loading staffing data...")
+
+@st.cache_resource
+def get_store():
+    """Process-wide last good data, revalidated in the background while the workbook is unreadable"""
+    ingester, history, data_store = get_ingester(), get_history(), get_data_store()
     
-    # Sidebar
-    st.sidebar.title("📊 Dashboard Controls")
-    st.sidebar.info(f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    def load():
+        # Revalidated data goes into the shared store too, so the next page run reuses it
+        version, data = read_data(ingester=ingester, history=history)
+        return version, data_store.get('dashboard', version, lambda: data)
+    return SnapshotStore(load)
+
+def export_detailed(version):
+    """Every exportable detailed-roles column of a data version, under its display name"""
+    export_df = load_export_data(version)
+    return export_frame(export_df, get_columns(version, export_df, 'export_columns'))
+
+def load_export_data(version):
+    """Load every detailed-roles column for one workbook version (used by the Excel export)"""
+    def load():
+        _, detailed_df, _ = load_workbook(FILE_PATH, version=version, columns='full', engine=EXCEL_ENGINE)
+        return prepare_detail(detailed_df)
+    return shared('export', version, load, "Preparing export data...")
+
+def check_workbook(force_hash=False):
+    """Poll the workbook and evict cached data that belonged to a replaced version"""
+    watcher = get_watcher()
+    version, previous = watcher.poll(force_hash=force_hash)
+    if previous is not None:
+        get_data_store().evict(previous)
     
-    # Add refresh button
-    if st.sidebar.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.rerun()
+    # Count only the re-reads the old 15-minute cache wipe (or a Refresh click) would have done
+    now = time.monotonic()
+    read = st.session_state.get('workbook_read')  # (sha256, time) this session last (re)loaded
+    if read is None or read[0] != version.sha256:
+        st.session_state['workbook_read'] = (version.sha256, now)
+    elif force_hash or now - read[1] >= LEGACY_REFRESH_SECONDS:
+        watcher.avoid_reload()
+        st.session_state['workbook_read'] = (version.sha256, now)
+    return version
+
+@TIMER.timed('load')
+def get_data():
+    """
+    Return (version, (summary_df, detailed_df, schema_issues)) - fresh when the workbook can be read,
+    otherwise the last good snapshot while a background thread keeps retrying.
+    Returns (None, None) only if nothing has ever been loaded.
+    """
+    store = get_store()
+    snapshot = store.snapshot
+    try:
+        version = check_workbook()
+        if store.revalidating and snapshot is not None and version.sha256 != snapshot.version.sha256:
+            # A background read is already in flight - serve the last good data immediately
+            return snapshot.version, snapshot.data
+        data = load_data(version)
+    except Exception as e:
+        if snapshot is None:
+            # Cold start while the workbook is locked: fall back to the newest snapshot on disk
+            latest = latest_snapshot('dashboard')
+            if latest is not None:
+                try:
+                    store.publish(latest[0], load_data(latest[0]), confirmed_at=latest[1])
+                except Exception:
+                    pass
+        store.fail(e)
+        snapshot = store.snapshot
+        return (snapshot.version, snapshot.data) if snapshot is not None else (None, None)
+
+    store.publish(version, data)
+    return version, data
+
+@TIMER.timed('metrics')
+def get_cube(version, summary_df, detailed_df):
+    """
+    Process-wide metrics for one data version: KPIs, per-area rates and role counts by every
+    filter dimension, so metric cards and charts never rescan the frames
+    """
+    return shared('cube', version, lambda: MetricsCube(summary_df, detailed_df))
+
+def get_columns(version, detailed_df, name='columns'):
+    """Process-wide column map (kind and display name of every column) of a detail frame for one data version"""
+    return shared(name, version, lambda: ColumnMap(detailed_df))
+
+def get_filter_index(version, detailed_df):
+    """Process-wide row-id index over FILTER_COLUMNS for one data version"""
+    return shared('index', version, lambda: FilterIndex(detailed_df, FILTER_COLUMNS))
+
+def show_memory():
+    """Process-wide vs. this session's memory"""
+    report = get_data_store().memory()
+    session_bytes = object_bytes({key: value for key, value in st.session_state.items()})
+    with st.expander("🧠 Memory"):
+        st.caption(f"Process: {format_bytes(process_memory())} resident")
+        st.caption(f"Shared data: {format_bytes(report['total'])} for {report['versions']} workbook version(s) "
+                   f"({', '.join(f'{name} {format_bytes(size)}' for name, size in report['by_name'].items())})")
+        st.caption(f"This session: {format_bytes(session_bytes)} of its own state")
+
+def session_id():
+    """Id of the session running this script (None outside a Streamlit run)"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+def show_timings():
+    """Performance panel: this session's last run by stage, plus rolling p50/p95 per stage"""
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        if not TIMER.enabled:
+            st.caption("Timing is switched off (STAFFING_TIMING=0)")
+            return
+        run = TIMER.last_run(session_id())
+        if run is not None:
+            st.caption(f"Last run: {run['total_ms']:,.0f} ms")
+            st.dataframe(pd.DataFrame({
+                'Stage': ['· ' * span['depth'] + span['name'] for span in run['spans']],
+                'ms': [span['ms'] for span in run['spans']],
+            }), hide_index=True, width='stretch')
+        stages = TIMER.percentiles()
+        if stages:
+            st.caption("Rolling percentiles (all sessions)")
+            st.dataframe(pd.DataFrame(
+                [(name, p50, p95, runs) for name, (p50, p95, runs) in sorted(stages.items())],
+                columns=['Stage', 'p50 ms', 'p95 ms', 'Runs']
+            ).round(1), hide_index=True, width='stretch')
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of serialized Plotly figures shared by every session"""
+    return FigureCache()
+
+@st.cache_resource
+def get_export_cache():
+    """Process-wide cache of generated export files shared by every session"""
+    return ExportCache()
+
+def export_button(version, name, label, file_name, build, *options, mime=XLSX_MIME):
+    """
+    Download button for export `name` of a data version (plus any options). Nothing is generated
+    until someone asks for the file: the first request builds it into the shared export cache,
+    and every later download of the same version and options is served from there.
+    """
+    cache = get_export_cache()
+    key = (version_key(version), name) + options
+    data = cache.peek(key)
+    if data is None:
+        if not st.button(label.replace('Download', 'Prepare', 1), key=f'prepare_{name}'):
+            return
+        with TIMER.span(f'export.{name}'), st.spinner("Generating export..."):
+            data = cache.file(key, build)
+    st.download_button(label=label, data=data, file_name=file_name, mime=mime)
+
+def cached_figure(version, view_by, name, build, *params):
+    """Figure `name` for a data version and view (plus any extra params), built only on a cache miss"""
+    with TIMER.span(f'chart.{name}'):
+        return get_figure_cache().figure((version_key(version), view_by, name) + params, build)
+
+@st.fragment(run_every=VERSION_POLL_SECONDS)
+def watch_workbook(rendered_version):
+    """Rerun the page only when the workbook content (or the revalidated snapshot) has changed"""
+    store = get_store()
+    snapshot = store.snapshot
+    if snapshot is not None and snapshot.version.sha256 != rendered_version.sha256:
+        st.rerun(scope="app")  # The background thread swapped in newer data
     
-    # Filter by Technology Area or Investment Area
-    filter_type = st.sidebar.radio("View By:", ["Technology Area", "Investment Area"])
+    if get_script_run_ctx().fragment_ids_this_run:
+        # Timed fragment rerun; on a full run get_data has already polled the workbook
+        try:
+            version = check_workbook()
+            if not store.revalidating and version.sha256 != rendered_version.sha256:
+                st.rerun(scope="app")
+        except OSError:
+            pass  # Workbook temporarily unavailable - keep showing the current data
     
-    # Split data into Technology Areas and Investment Areas
-    # Only use rows where 'Technology Area' column has actual technology areas (not investment areas)
-    # The first section contains Technology Areas, then there's a break, then Investment Areas
-    tech_areas_df = summary_df[
-        (summary_df['Technology Area'].notna()) & 
-        (summary_df['#'].notna()) &
-        (~summary_df['Technology Area'].str.contains('Investment', case=False, na=False))
-    ].head(6).copy()  # Limit to first 6 technology areas to avoid duplicates
+    # Snapshot age badge
+    age = format_age(store.age_seconds())
+    if store.stale:
+        st.warning(f"🟠 Showing snapshot from {age} ago - the workbook is locked or syncing, retrying in the background")
+    else:
+        st.success(f"🟢 Live data (checked {age} ago)")
+    changes = get_ingester().last_changes
+    if changes is not None:
+        st.caption(f"✏️ Last refresh: {len(changes.inserted):,} added, {len(changes.updated):,} changed, "
+                   f"{len(changes.deleted):,} removed roles")
+    st.caption(f"♻️ Reloads avoided: {get_watcher().reloads_avoided:,}",
+               help="Scheduled 15-minute refreshes and Refresh clicks that found the workbook unchanged "
+                    "and reused the cached data instead of re-reading the Excel file")
+    figures = get_figure_cache().stats()
+    st.caption(f"📊 Chart cache: {figures['hits']:,} hits / {figures['misses']:,} misses",
+               help=f"Charts reused from the shared figure cache vs. built from scratch "
+                    f"({figures['entries']} cached, {figures['bytes'] / 1024:,.0f} KB, {figures['evictions']} evicted)")
+    exports = get_export_cache().stats()
+    st.caption(f"📥 Export cache: {exports['entries']} file(s), {format_bytes(exports['bytes'])}",
+               help=f"Export files generated on request and shared by every session until the data changes "
+                    f"({exports['misses']:,} generated, {exports['evictions']} evicted)")
+
+@st.fragment
+@TIMER.timed('tab.overview', session=session_id)
+def render_overview(version, cube, view_by):
+    """Overview tab: overall hiring progress and the per-area breakdown"""
+    tech_areas_df = cube.areas
+    total_roles, total_open, total_closed = (cube.totals['total_roles'], cube.totals['total_open'],
+                                             cube.totals['total_closed'])
+    close_rate = cube.totals['close_rate']
     
-    # Get investment areas (rows where 'Investment Area' column is populated)
-    investment_df = summary_df[
-        (summary_df['Investment Area'].notna() if 'Investment Area' in summary_df.columns else False)
-    ].copy() if 'Investment Area' in summary_df.columns else pd.DataFrame()
+    st.subheader("Hiring Progress Overview")
     
-    # Key Metrics Row
-    st.subheader("📈 Overall Metrics")
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    total_roles = tech_areas_df['# of New Roles'].sum()
-    total_investment = tech_areas_df['Est. Investment'].sum()
-    total_open = tech_areas_df['Open Roles'].sum()
-    total_closed = tech_areas_df['Closed Roles'].sum()
-    close_rate = (total_closed / total_roles * 100) if total_roles > 0 else 0
+    col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Total New Roles", f"{int(total_roles)}")
-    
-    with col2:
-        st.metric("Total Investment", f"${total_investment/1000000:.2f}M")
-    
-    with col3:
-        st.metric("Open Roles", f"{int(total_open)}")
-    
-    with col4:
-        st.metric("Closed Roles", f"{int(total_closed)}",
-                 delta=f"{close_rate:.1f}%")
-    
-    with col5:
-        avg_cost = total_investment / total_roles if total_roles > 0 else 0
-        st.metric("Avg Cost/Role", f"${avg_cost/1000:.0f}K")
-    
-    # Tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "📊 Overview",
-        "🎯 Technology Areas", 
-        "💰 Investment Analysis",
-        "📋 Detailed Data"
-    ])
-    
-    with tab1:
-        st.subheader("Hiring Progress Overview")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Overall progress
+        # Overall progress
+        def build_fig1():
             fig1 = go.Figure(go.Indicator(
                 mode = "gauge+number+delta",
                 value = total_closed,
@@ -358,10 +516,12 @@ def main():
                 }
             ))
             fig1.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)')
-            st.plotly_chart(fig1, use_container_width=True)
-        
-        with col2:
-            # Status breakdown
+            return fig1
+        st.plotly_chart(cached_figure(version, view_by, 'fig1', build_fig1), width='stretch')
+    
+    with col2:
+        # Status breakdown
+        def build_fig2():
             status_data = pd.DataFrame({
                 'Status': ['Closed (Filled)', 'Open (Recruiting)'],
                 'Count': [total_closed, total_open]
@@ -371,15 +531,17 @@ def main():
                          color_discrete_sequence=[FA_GREEN_LIGHT, FA_WARNING])
             fig2.update_layout(height=300, paper_bgcolor='rgba(0,0,0,0)', 
                              title_font_color=FA_GREEN, title_font_size=16)
-            st.plotly_chart(fig2, use_container_width=True)
-        
-        # Technology Areas Overview
-        st.subheader("Technology Areas Breakdown")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Roles by Technology Area
+            return fig2
+        st.plotly_chart(cached_figure(version, view_by, 'fig2', build_fig2), width='stretch')
+    
+    # Technology Areas Overview
+    st.subheader("Technology Areas Breakdown")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Roles by Technology Area
+        def build_fig3():
             tech_sorted = tech_areas_df.sort_values('# of New Roles', ascending=True)
             fig3 = px.bar(tech_sorted, 
                          y='Technology Area', 
@@ -390,10 +552,12 @@ def main():
                          color_continuous_scale=[[0, FA_GREEN_LIGHT], [1, FA_GREEN]])
             fig3.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
                              title_font_color=FA_GREEN, title_font_size=16)
-            st.plotly_chart(fig3, use_container_width=True)
-        
-        with col2:
-            # Investment by Technology Area
+            return fig3
+        st.plotly_chart(cached_figure(version, view_by, 'fig3', build_fig3), width='stretch')
+    
+    with col2:
+        # Investment by Technology Area
+        def build_fig4():
             fa_colors = [FA_GREEN, FA_GREEN_LIGHT, FA_WARNING, '#4A90E2', '#F39C12', '#8E44AD']
             fig4 = px.pie(tech_areas_df, 
                          values='Est. Investment', 
@@ -402,49 +566,84 @@ def main():
                          color_discrete_sequence=fa_colors)
             fig4.update_layout(paper_bgcolor='rgba(0,0,0,0)',
                              title_font_color=FA_GREEN, title_font_size=16)
-            st.plotly_chart(fig4, use_container_width=True)
+            return fig4
+        st.plotly_chart(cached_figure(version, view_by, 'fig4', build_fig4), width='stretch')
+
+@st.fragment
+@TIMER.timed('tab.technology_areas', session=session_id)
+def render_technology_areas(version, cube, view_by):
+    """Technology Areas tab (the area selectbox reruns only this tab)"""
+    tech_areas_df = cube.areas
     
-    with tab2:
-        st.subheader("Technology Area Details")
+    st.subheader("Technology Area Details")
+    
+    # Select technology area
+    tech_area = st.selectbox("Select Technology Area", 
+                            tech_areas_df['Technology Area'].unique())
+    
+    if tech_area:
+        selected_tech = tech_areas_df[tech_areas_df['Technology Area'] == tech_area].iloc[0]
+        
+        # Show metrics for selected area
+        col1, col2, col3, col4 = st.columns(4)
         
-        # Select technology area
-        tech_area = st.selectbox("Select Technology Area", 
-                                tech_areas_df['Technology Area'].unique())
+        with col1:
+            st.metric("Leader", selected_tech['Leaders'])
+        with col2:
+            st.metric("Total Roles", int(selected_tech['# of New Roles']))
+        with col3:
+            st.metric("Open", int(selected_tech['Open Roles']))
+        with col4:
+            st.metric("Closed", int(selected_tech['Closed Roles']))
         
-        if tech_area:
-            selected_tech = tech_areas_df[tech_areas_df['Technology Area'] == tech_area].iloc[0]
-            
-            # Show metrics for selected area
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Leader", selected_tech['Leaders'])
-            with col2:
-                st.metric("Total Roles", int(selected_tech['# of New Roles']))
-            with col3:
-                st.metric("Open", int(selected_tech['Open Roles']))
-            with col4:
-                st.metric("Closed", int(selected_tech['Closed Roles']))
-            
-            # Progress bar
-            total_roles = selected_tech['# of New Roles']
-            if total_roles > 0:
-                progress = selected_tech['Closed Roles'] / total_roles
-                st.progress(progress, text=f"Progress: {progress*100:.1f}%")
-            else:
-                st.progress(0.0, text="Progress: 0.0%")
-            
-            # Investment details
-            st.metric("Estimated Investment", 
-                     f"${selected_tech['Est. Investment']/1000000:.2f}M")
+        # Progress bar
+        total_roles = selected_tech['# of New Roles']
+        if total_roles > 0:
+            progress = selected_tech['Closed Roles'] / total_roles
+            st.progress(progress, text=f"Progress: {progress*100:.1f}%")
+        else:
+            st.progress(0.0, text="Progress: 0.0%")
         
-        # Comparison chart
-        st.subheader("Technology Area Comparison")
+        # Investment details
+        st.metric("Estimated Investment", 
+                 f"${selected_tech['Est. Investment']/1000000:.2f}M")
         
-        comparison_df = tech_areas_df.copy()
-        comparison_df['Close Rate %'] = (comparison_df['Closed Roles'] / 
-                                          comparison_df['# of New Roles'] * 100)
+        # Team breakdown of the selected area
+        teams = cube.teams[cube.teams['Technology Area'] == tech_area].drop(columns=['Technology Area'])
+        if len(teams) > 0:
+            teams['Est. Investment'] = teams['Est. Investment'].apply(lambda x: f'${x:,.0f}')
+            st.dataframe(teams, width='stretch', hide_index=True)
         
+        # Hiring ramp over time (one point per recorded workbook version)
+        trend = get_history().area_trend(tech_area)
+        if len(trend) > 1:
+            def build_fig_trend():
+                fig_trend = go.Figure()
+                fig_trend.add_trace(go.Scatter(x=trend['as_of'], y=trend['open'], name='Open Roles',
+                                               mode='lines+markers', line=dict(color=FA_WARNING, width=3)))
+                fig_trend.add_trace(go.Scatter(x=trend['as_of'], y=trend['closed'], name='Closed Roles',
+                                               mode='lines+markers', line=dict(color=FA_GREEN, width=3)))
+                fig_trend.update_layout(
+                    title=f'Hiring Ramp Over Time - {tech_area}',
+                    xaxis_title='Workbook Version Date',
+                    yaxis_title='Number of Roles',
+                    hovermode='x unified',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    title_font_color=FA_GREEN,
+                    title_font_size=16
+                )
+                return fig_trend
+            st.plotly_chart(cached_figure(version, view_by, 'fig_trend', tech_area, len(trend), build_fig_trend), width='stretch')
+        else:
+            st.caption("📈 The hiring ramp trend appears once the workbook has been updated at least once.")
+    
+    # Comparison chart
+    st.subheader("Technology Area Comparison")
+    
+    comparison_df = tech_areas_df  # 'Close Rate %' is precomputed per version
+    
+    def build_fig5():
         fig5 = go.Figure()
         fig5.add_trace(go.Bar(
             x=comparison_df['Technology Area'],
@@ -469,9 +668,11 @@ def main():
             title_font_color=FA_GREEN,
             title_font_size=16
         )
-        st.plotly_chart(fig5, use_container_width=True)
-        
-        # Close rate comparison
+        return fig5
+    st.plotly_chart(cached_figure(version, view_by, 'fig5', build_fig5), width='stretch')
+    
+    # Close rate comparison
+    def build_fig6():
         fig6 = px.bar(comparison_df,
                      x='Technology Area',
                      y='Close Rate %',
@@ -482,15 +683,22 @@ def main():
         fig6.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
         fig6.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
                          title_font_color=FA_GREEN, title_font_size=16)
-        st.plotly_chart(fig6, use_container_width=True)
+        return fig6
+    st.plotly_chart(cached_figure(version, view_by, 'fig6', build_fig6), width='stretch')
+
+@st.fragment
+@TIMER.timed('tab.investment_analysis', session=session_id)
+def render_investment_analysis(version, cube, view_by):
+    """Investment Analysis tab"""
+    tech_areas_df = cube.areas
     
-    with tab3:
-        st.subheader("Investment Analysis")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Investment vs Roles  
+    st.subheader("Investment Analysis")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Investment vs Roles  
+        def build_fig7():
             fig7 = px.scatter(tech_areas_df,
                             x='# of New Roles',
                             y='Est. Investment',
@@ -503,13 +711,14 @@ def main():
                             color_discrete_sequence=[FA_GREEN, FA_GREEN_LIGHT, FA_WARNING, '#4A90E2', '#F39C12', '#8E44AD'])
             fig7.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
                              title_font_color=FA_GREEN, title_font_size=16)
-            st.plotly_chart(fig7, width='stretch')
+            return fig7
+        st.plotly_chart(cached_figure(version, view_by, 'fig7', build_fig7), width='stretch')
+    
+    with col2:
+        # Average cost per role
+        cost_df = tech_areas_df  # 'Avg Cost per Role' is precomputed per version
         
-        with col2:
-            # Average cost per role
-            cost_df = tech_areas_df.copy()
-            cost_df['Avg Cost per Role'] = cost_df['Est. Investment'] / cost_df['# of New Roles']
-            
+        def build_fig8():
             fig8 = px.bar(cost_df.sort_values('Avg Cost per Role', ascending=False),
                          x='Technology Area',
                          y='Avg Cost per Role',
@@ -518,316 +727,341 @@ def main():
                          color_continuous_scale=[[0, FA_GREEN_LIGHT], [1, FA_GREEN]])
             fig8.update_layout(xaxis_tickangle=-45, paper_bgcolor='rgba(0,0,0,0)', 
                              plot_bgcolor='rgba(0,0,0,0)', title_font_color=FA_GREEN, title_font_size=16)
-            st.plotly_chart(fig8, use_container_width=True)
-        
-        # Investment breakdown table
-        st.subheader("Investment Breakdown")
-        
-        invest_summary = tech_areas_df[['Technology Area', 'Leaders', '# of New Roles', 
-                                        'Est. Investment', 'Open Roles', 'Closed Roles']].copy()
-        invest_summary['Avg Cost/Role'] = invest_summary['Est. Investment'] / invest_summary['# of New Roles']
-        invest_summary['Close Rate %'] = (invest_summary['Closed Roles'] / 
-                                          invest_summary['# of New Roles'] * 100)
-        
-        # Format currency columns
-        invest_summary['Est. Investment'] = invest_summary['Est. Investment'].apply(lambda x: f'${x:,.0f}')
-        invest_summary['Avg Cost/Role'] = invest_summary['Avg Cost/Role'].apply(lambda x: f'${x:,.0f}')
-        invest_summary['Close Rate %'] = invest_summary['Close Rate %'].apply(lambda x: f'{x:.1f}%')
-        
-        st.dataframe(invest_summary, use_container_width=True, height=400)
+            return fig8
+        st.plotly_chart(cached_figure(version, view_by, 'fig8', build_fig8), width='stretch')
     
-    with tab4:
-        st.subheader("Detailed Staffing Data")
-        
-        # Display raw summary data
-        st.write("### Technology Areas Summary")
-        display_df = tech_areas_df[['#', 'Technology Area', 'Leaders', '# of New Roles', 
-                                    'Est. Investment', 'Open Roles', 'Closed Roles']].copy()
-        # Format Est. Investment as currency
-        display_df['Est. Investment'] = display_df['Est. Investment'].apply(lambda x: f'${x:,.0f}')
-        st.dataframe(display_df, use_container_width=True)
-        
-        # Display detailed roles data
-        st.write("### Detailed Roles Breakdown")
-        
-        if detailed_df is not None and len(detailed_df) > 0:
-            # Add filters for detailed data
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                if 'Status' in detailed_df.columns:
-                    status_options = ['All'] + sorted([s for s in detailed_df['Status'].dropna().unique() if s])
-                    status_filter = st.multiselect(
-                        "Filter by Status",
-                        options=status_options,
-                        default=['All']
-                    )
-                else:
-                    status_filter = ['All']
-            
-            with col2:
-                if 'Technology Area' in detailed_df.columns:
-                    tech_options = ['All'] + sorted([t for t in detailed_df['Technology Area'].dropna().unique() if t])
-                    tech_filter = st.multiselect(
-                        "Filter by Technology Area",
-                        options=tech_options,
-                        default=['All']
-                    )
-                else:
-                    tech_filter = ['All']
-            
-            with col3:
-                if 'TEAM NAME' in detailed_df.columns:
-                    team_options = ['All'] + sorted([t for t in detailed_df['TEAM NAME'].dropna().unique() if t])
-                    team_filter = st.multiselect(
-                        "Filter by Team",
-                        options=team_options,
-                        default=['All']
-                    )
-                else:
-                    team_filter = ['All']
-            
-            # Apply filters
-            filtered_detailed = detailed_df.copy()
-            
-            if 'Status' in detailed_df.columns and 'All' not in status_filter and len(status_filter) > 0:
-                filtered_detailed = filtered_detailed[filtered_detailed['Status'].isin(status_filter)]
-            
-            if 'Technology Area' in detailed_df.columns and 'All' not in tech_filter and len(tech_filter) > 0:
-                filtered_detailed = filtered_detailed[filtered_detailed['Technology Area'].isin(tech_filter)]
-            
-            if 'TEAM NAME' in detailed_df.columns and 'All' not in team_filter and len(team_filter) > 0:
-                filtered_detailed = filtered_detailed[filtered_detailed['TEAM NAME'].isin(team_filter)]
-            
-            # Show metrics for filtered data
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Filtered Roles", len(filtered_detailed))
-            with col2:
-                # Count all non-Closed roles as Open
-                closed_count = len(filtered_detailed[filtered_detailed['Status'] == 'Closed']) if 'Status' in filtered_detailed.columns else 0
-                open_count = len(filtered_detailed) - closed_count
-                st.metric("Open", open_count)
-            with col3:
-                st.metric("Closed", closed_count)
-            
-            # Select key columns to display in specified order
-            display_cols = ['Technology Area', 'TEAM NAME', 'Worker Type', 'Req ID', 
-                          'Recruitment Status', 'Location', 'Senior Leader', 'Hiring Manager',
-                          'Target \nStart Date', 'Target \nEnd Date', 'Actual Start', 'Status', 'Comment']
-            available_cols = [col for col in display_cols if col in filtered_detailed.columns]
-            
-            # Format display data
-            display_data = filtered_detailed[available_cols].copy()
-            
-            # Rename columns to remove newlines for better display
-            column_rename = {
-                'Target \nStart Date': 'Target Start Date',
-                'Target \nEnd Date': 'Target End Date'
-            }
-            display_data = display_data.rename(columns=column_rename)
-            
-            # Format date columns as MM/DD/YYYY
-            date_columns = ['Target Start Date', 'Target End Date', 'Actual Start']
-            for date_col in date_columns:
-                if date_col in display_data.columns:
-                    display_data[date_col] = pd.to_datetime(display_data[date_col], errors='coerce').dt.strftime('%m/%d/%Y')
-                    display_data[date_col] = display_data[date_col].replace('NaT', '')
-            
-            # Display the detailed data (read-only for now to prevent data corruption)
-            st.write("**Note:** Data is read-only. Edit the Excel file directly in OneDrive for updates.")
-            
-            st.dataframe(
-                display_data, 
-                use_container_width=True, 
-                height=400
+    # Investment breakdown table
+    st.subheader("Investment Breakdown")
+    
+    invest_summary = tech_areas_df[['Technology Area', 'Leaders', '# of New Roles', 
+                                    'Est. Investment', 'Open Roles', 'Closed Roles',
+                                    'Avg Cost per Role', 'Close Rate %']].rename(
+                                        columns={'Avg Cost per Role': 'Avg Cost/Role'})
+    
+    # Format currency columns
+    invest_summary['Est. Investment'] = invest_summary['Est. Investment'].apply(lambda x: f'${x:,.0f}')
+    invest_summary['Avg Cost/Role'] = invest_summary['Avg Cost/Role'].apply(lambda x: f'${x:,.0f}')
+    invest_summary['Close Rate %'] = invest_summary['Close Rate %'].apply(lambda x: f'{x:.1f}%')
+    
+    st.dataframe(invest_summary, width='stretch', height=400)
+
+@TIMER.timed('tab.detailed')
+def render_detailed_data(version, cube, detailed_df):
+    """Detailed Data tab: area summary, the filtered roles table and the exports"""
+    tech_areas_df = cube.areas
+    
+    st.subheader("Detailed Staffing Data")
+    
+    # Display raw summary data
+    st.write("### Technology Areas Summary")
+    display_df = tech_areas_df[['#', 'Technology Area', 'Leaders', '# of New Roles', 
+                                'Est. Investment', 'Open Roles', 'Closed Roles']]
+    # Format Est. Investment as currency
+    display_df['Est. Investment'] = display_df['Est. Investment'].apply(lambda x: f'${x:,.0f}')
+    st.dataframe(display_df, width='stretch')
+    
+    # Display detailed roles data
+    st.write("### Detailed Roles Breakdown")
+    
+    if detailed_df is not None and len(detailed_df) > 0:
+        render_detailed_roles(version, cube, detailed_df)
+    else:
+        st.info("No detailed roles data available.")
+    
+    render_exports(version, cube, detailed_df, display_df)
+
+@st.fragment
+@TIMER.timed('tab.detailed.roles', session=session_id)
+def render_detailed_roles(version, cube, detailed_df):
+    """Filters, filtered metrics and the roles table (a filter change reruns only this part)"""
+    # Add filters for detailed data
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if 'Status' in detailed_df.columns:
+            status_options = ['All'] + cube.values('Status')
+            status_filter = st.multiselect(
+                "Filter by Status",
+                options=status_options,
+                default=['All']
             )
         else:
-            st.info("No detailed roles data available.")
-        
-        # Export options
-        st.subheader("📥 Export Data")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Create formatted Excel for Summary
-            from io import BytesIO
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            from openpyxl.utils import get_column_letter
-            
-            # Remove hidden columns
-            summary_export = display_df.copy()
-            cols_to_hide = ['Est. Blended Hourly Rate', 'Est. Forecast']
-            summary_export = summary_export.drop(columns=[col for col in cols_to_hide if col in summary_export.columns], errors='ignore')
-            
-            # Format column headers - convert date timestamps to MM-DD-YY format for columns Z onwards
-            new_columns = []
-            for col in summary_export.columns:
-                col_str = str(col)
-                # Try to parse as date and format if it looks like a date/timestamp
-                try:
-                    # Remove any ISO timestamp portion (e.g., "2025-12-09T15:45:19z")
-                    if 'T' in col_str or len(col_str) > 10:
-                        date_part = col_str.split('T')[0]  # Get date portion before 'T'
-                        parsed_date = pd.to_datetime(date_part)
-                        new_columns.append(parsed_date.strftime('%m-%d-%y'))
-                    else:
-                        # Try parsing as regular date
-                        parsed_date = pd.to_datetime(col_str)
-                        new_columns.append(parsed_date.strftime('%m-%d-%y'))
-                except:
-                    # Not a date, keep original
-                    new_columns.append(col)
-            summary_export.columns = new_columns
-            
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                summary_export.to_excel(writer, sheet_name='Summary', index=False)
-                workbook = writer.book
-                worksheet = writer.sheets['Summary']
-                
-                # Format styles
-                header_fill = PatternFill(start_color='00A84F', end_color='00A84F', fill_type='solid')
-                header_font = Font(bold=True, color='FFFFFF', size=12)
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                
-                # Format header row and enable auto-filter
-                for cell in worksheet[1]:
-                    cell.fill = header_fill
-                    cell.font = header_font
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                    cell.border = thin_border
-                
-                # Enable auto-filter on all columns
-                worksheet.auto_filter.ref = worksheet.dimensions
-                
-                # Format all data cells with borders and date formatting
-                for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=1, max_col=worksheet.max_column):
-                    for cell in row:
-                        cell.border = thin_border
-                        # Format dates as mm/dd/yyyy
-                        if cell.value and isinstance(cell.value, (datetime, pd.Timestamp)):
-                            cell.number_format = 'mm/dd/yyyy'
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column = [cell for cell in column]
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-            
-            st.download_button(
-                label="📊 Download Summary as Excel",
-                data=buffer.getvalue(),
-                file_name=f"tech_staffing_summary_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            status_filter = ['All']
+    
+    with col2:
+        if 'Technology Area' in detailed_df.columns:
+            tech_options = ['All'] + cube.values('Technology Area')
+            tech_filter = st.multiselect(
+                "Filter by Technology Area",
+                options=tech_options,
+                default=['All']
             )
-        
-        with col2:
-            if detailed_df is not None and len(detailed_df) > 0:
-                # Create formatted Excel for Detailed Roles
-                from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-                
-                # Remove hidden columns
-                detailed_export = detailed_df.copy()
-                cols_to_hide = ['Est. Blended Hourly Rate', 'Est. Forecast']
-                detailed_export = detailed_export.drop(columns=[col for col in cols_to_hide if col in detailed_export.columns], errors='ignore')
-                
-                # Format column headers - convert date timestamps to MM-DD-YY format for columns Z onwards
-                new_columns = []
-                for col in detailed_export.columns:
-                    col_str = str(col)
-                    # Try to parse as date and format if it looks like a date/timestamp
-                    try:
-                        # Remove any ISO timestamp portion (e.g., "2025-12-09T15:45:19z")
-                        if 'T' in col_str or len(col_str) > 10:
-                            date_part = col_str.split('T')[0]  # Get date portion before 'T'
-                            parsed_date = pd.to_datetime(date_part)
-                            new_columns.append(parsed_date.strftime('%m-%d-%y'))
-                        else:
-                            # Try parsing as regular date
-                            parsed_date = pd.to_datetime(col_str)
-                            new_columns.append(parsed_date.strftime('%m-%d-%y'))
-                    except:
-                        # Not a date, keep original
-                        new_columns.append(col)
-                detailed_export.columns = new_columns
-                
-                buffer2 = BytesIO()
-                with pd.ExcelWriter(buffer2, engine='openpyxl') as writer:
-                    detailed_export.to_excel(writer, sheet_name='Detailed Roles', index=False)
-                    workbook = writer.book
-                    worksheet = writer.sheets['Detailed Roles']
-                    
-                    # Format styles
-                    header_fill = PatternFill(start_color='00A84F', end_color='00A84F', fill_type='solid')
-                    header_font = Font(bold=True, color='FFFFFF', size=12)
-                    thin_border = Border(
-                        left=Side(style='thin'),
-                        right=Side(style='thin'),
-                        top=Side(style='thin'),
-                        bottom=Side(style='thin')
-                    )
-                    
-                    # Format header row
-                    for cell in worksheet[1]:
-                        cell.fill = header_fill
-                        cell.font = header_font
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-                        cell.border = thin_border
-                    
-                    # Enable auto-filter on all columns
-                    worksheet.auto_filter.ref = worksheet.dimensions
-                    
-                    # Format all data cells with borders and date formatting
-                    for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row, min_col=1, max_col=worksheet.max_column):
-                        for cell in row:
-                            cell.border = thin_border
-                            # Format dates as mm/dd/yyyy
-                            if cell.value and isinstance(cell.value, (datetime, pd.Timestamp)):
-                                cell.number_format = 'mm/dd/yyyy'
-                    
-                    # Auto-adjust column widths
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column = [cell for cell in column]
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)
-                        worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-                
-                st.download_button(
-                    label="📋 Download Detailed Roles as Excel",
-                    data=buffer2.getvalue(),
-                    file_name=f"tech_staffing_detailed_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-            else:
-                # Summary report
-                if st.button("📄 Generate Summary Report"):
-                    st.write("### Summary Statistics")
-                    st.write(f"- Total Technology Areas: {len(tech_areas_df)}")
-                    st.write(f"- Total New Roles: {int(total_roles)}")
-                    st.write(f"- Total Investment: ${total_investment:,.0f}")
-                    st.write(f"- Average Investment per Role: ${avg_cost:,.0f}")
-                    st.write(f"- Overall Close Rate: {close_rate:.1f}%")
-                    st.write(f"- Roles Still Open: {int(total_open)}")
+        else:
+            tech_filter = ['All']
+    
+    with col3:
+        if 'TEAM NAME' in detailed_df.columns:
+            team_options = ['All'] + cube.values('TEAM NAME')
+            team_filter = st.multiselect(
+                "Filter by Team",
+                options=team_options,
+                default=['All']
+            )
+        else:
+            team_filter = ['All']
+    
+    # Apply filters (row-id set intersection over the per-version index, 'All' = no filter)
+    filters = {
+        'Status': [] if 'All' in status_filter else status_filter,
+        'Technology Area': [] if 'All' in tech_filter else tech_filter,
+        'TEAM NAME': [] if 'All' in team_filter else team_filter,
+    }
+    index = get_filter_index(version, detailed_df)
+    
+    # Show metrics for filtered data (answered from the cube, all non-Closed roles count as Open)
+    filtered_count, open_count, closed_count = cube.roles(filters)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Filtered Roles", filtered_count)
+    with col2:
+        st.metric("Open", open_count)
+    with col3:
+        st.metric("Closed", closed_count)
+    
+    # Select key columns to display in specified order
+    display_cols = ['Technology Area', 'TEAM NAME', 'Worker Type', 'Req ID', 
+                  'Recruitment Status', 'Location', 'Senior Leader', 'Hiring Manager',
+                  'Target \nStart Date', 'Target \nEnd Date', 'Actual Start', 'Status', 'Comment']
+    available_cols = [col for col in display_cols if col in detailed_df.columns]
+    
+    # Display names (no line breaks) come from the version's column map
+    columns = get_columns(version, detailed_df)
+    column_rename = columns.renames(available_cols)
+    
+    # Table controls - sorting runs on the cached index, and only the visible page is sliced and sent
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        sort_options = {'(workbook order)': None}
+        sort_options.update({column_rename.get(col, col): col for col in available_cols})
+        sort_by = sort_options[st.selectbox("Sort by", list(sort_options))]
+    with col2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+    with col3:
+        page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, index=1)
+    
+    with TIMER.span('table.sort'):
+        rows = index.sorted_rows(filters, sort_by, ascending)
+    page_count = max(1, -(-len(rows) // page_size))
+    if st.session_state.get('table_page', 1) > page_count:
+        st.session_state['table_page'] = page_count  # The filters shrank the result
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key='table_page')
+    
+    # Format display data (the visible page only)
+    start = (page - 1) * page_size
+    with TIMER.span('table.page'):
+        display_data = detailed_df.take(rows[start:start + page_size])[available_cols]
+        display_data = display_data.rename(columns=column_rename)
+    
+    # Dates stay datetime64 and are formatted as MM/DD/YYYY by the table itself
+    date_columns = [columns.display(col) for col in columns.columns(DATE)]
+    column_config = {
+        date_col: st.column_config.DateColumn(date_col, format="MM/DD/YYYY")
+        for date_col in date_columns if date_col in display_data.columns
+    }
+    
+    # Display the detailed data (read-only for now to prevent data corruption)
+    st.write("**Note:** Data is read-only. Edit the Excel file directly in OneDrive for updates.")
+    
+    st.dataframe(
+        display_data, 
+        width='stretch', 
+        height=400,
+        column_config=column_config
+    )
+    st.caption(f"Rows {min(start + 1, len(rows)):,}-{min(start + page_size, len(rows)):,} of {len(rows):,} "
+               f"(page {page} of {page_count})")
+    
+    # Export of exactly this view: the filtered rows in table order, with the filters on their own sheet
+    def filtered_sheets():
+        view = detailed_df.take(rows)
+        applied = [(name, ', '.join(values) if values else 'All') for name, values in filters.items()]
+        applied.append(('Sort', f"{column_rename.get(sort_by, sort_by)} ({'ascending' if ascending else 'descending'})"
+                                if sort_by else '(workbook order)'))
+        applied.append(('Rows', f'{len(rows):,}'))
+        return {
+            'Filtered Roles': export_frame(view[available_cols], columns),
+            'Technology Areas': export_frame(area_summary(view)),
+            'Filters': pd.DataFrame(applied, columns=['Filter', 'Value']),
+        }
+    
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key='filtered_export_format',
+                                     help="Excel includes the per-area totals and the applied filters as extra sheets")
+    with col2:
+        extension, mime = EXPORT_FORMATS[export_format]
+        export_button(version, 'filtered', f"⬇️ Download Filtered View ({len(rows):,} roles)",
+                      f"tech_staffing_filtered_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                      lambda: export_bytes(export_format, filtered_sheets()),
+                      export_format, tuple((name, tuple(values)) for name, values in filters.items()), sort_by, ascending,
+                      mime=mime)
+
+@st.fragment
+@TIMER.timed('tab.detailed.exports', session=session_id)
+def render_exports(version, cube, detailed_df, display_df):
+    """Summary and detailed-roles Excel downloads"""
+    tech_areas_df = cube.areas
+    total_roles, total_investment, total_open = (cube.totals['total_roles'], cube.totals['total_investment'],
+                                                 cube.totals['total_open'])
+    close_rate, avg_cost = cube.totals['close_rate'], cube.totals['avg_cost']
+    
+    # Export options
+    st.subheader("📥 Export Data")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Formatted Excel for Summary (hidden columns removed, date headers as MM-DD-YY)
+        export_button(version, 'summary', "📊 Download Summary as Excel",
+                      f"tech_staffing_summary_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                      lambda: excel_bytes(export_frame(display_df), 'Summary'))
+    
+    with col2:
+        if detailed_df is not None and len(detailed_df) > 0:
+            # Formatted Excel for Detailed Roles (every column of the workbook)
+            export_button(version, 'detailed', "📋 Download Detailed Roles as Excel",
+                          f"tech_staffing_detailed_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                          lambda: excel_bytes(export_detailed(version), 'Detailed Roles'))
+        else:
+            # Summary report
+            if st.button("📄 Generate Summary Report"):
+                st.write("### Summary Statistics")
+                st.write(f"- Total Technology Areas: {len(tech_areas_df)}")
+                st.write(f"- Total New Roles: {int(total_roles)}")
+                st.write(f"- Total Investment: ${total_investment:,.0f}")
+                st.write(f"- Average Investment per Role: ${avg_cost:,.0f}")
+                st.write(f"- Overall Close Rate: {close_rate:.1f}%")
+                st.write(f"- Roles Still Open: {int(total_open)}")
+
+def main():
+    # The whole run is timed; the panel is drawn afterwards so it shows this run's breakdown
+    with TIMER.span('page', session=session_id()):
+        render_page()
+    if st.session_state.get('show_timings'):
+        show_timings()
+
+def render_page():
+    # Header with First Advantage Branding
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        try:
+            st.image(r"C:\Users\Eric.Jaffe\OneDrive - First Advantage Corporation\Desktop\partner-FirstAdvantage-logo-1.png", width=150)
+        except:
+            pass  # Hide fallback text
+    
+    with col2:
+        st.markdown(f"""
+            <div style='padding-top: 20px;'>
+                <h1 style='color: {FA_GREEN}; margin-bottom: 0; font-weight: 700;'>Global Technology 2026 Staffing Dashboard</h1>
+            </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("<hr style='margin-top: 10px; margin-bottom: 30px; border-color: #00a84f;'>", unsafe_allow_html=True)
+    
+    # Load data (falls back to the last good snapshot while the workbook is unreadable)
+    version, data = get_data()
+    if data is None:
+        st.error(f"Error loading file: {get_store().last_error}")
+        st.info("Please make sure the Excel file is closed - the dashboard keeps retrying in the background.")
+        return
+    summary_df, detailed_df, schema_issues = data
+    
+    if schema_issues:
+        with st.expander(f"⚠️ {len(schema_issues)} workbook schema issue(s)"):
+            for issue in schema_issues:
+                st.write(f"- {issue}")
+    
+    # Sidebar
+    st.sidebar.title("📊 Dashboard Controls")
+    st.sidebar.info(f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    
+    # Add refresh button (re-hashes the workbook; cached data is kept unless it changed)
+    if st.sidebar.button("🔄 Refresh Data"):
+        try:
+            if check_workbook(force_hash=True).sha256 != version.sha256:
+                st.rerun()
+        except OSError:
+            get_store().revalidate()
+    
+    with st.sidebar:
+        watch_workbook(version)
+        show_memory()
+        st.toggle("⏱️ Performance panel", key='show_timings',
+                  help="Time of each stage in the last run, and rolling p50/p95 per stage")
+    
+    # Filter by Technology Area or Investment Area
+    filter_type = st.sidebar.radio("View By:", ["Technology Area", "Investment Area"])
+    
+    # Technology Areas, Investment Areas and every metric below come from the per-version cube,
+    # which totals the detail sheet; the summary sheet is only cross-checked
+    cube = get_cube(version, summary_df, detailed_df)
+    if cube.discrepancies:
+        with st.expander(f"⚠️ Summary sheet differs from the detailed roles in {len(cube.discrepancies)} place(s)"):
+            st.caption("Every metric is computed from the detailed roles; the summary sheet's totals are only compared.")
+            for issue in cube.discrepancies:
+                st.write(f"- {issue}")
+    
+    # Key Metrics Row
+    st.subheader("📈 Overall Metrics")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    total_roles = cube.totals['total_roles']
+    total_investment = cube.totals['total_investment']
+    total_open = cube.totals['total_open']
+    total_closed = cube.totals['total_closed']
+    close_rate = cube.totals['close_rate']
+    
+    with col1:
+        st.metric("Total New Roles", f"{int(total_roles)}")
+    
+    with col2:
+        st.metric("Total Investment", f"${total_investment/1000000:.2f}M")
+    
+    with col3:
+        st.metric("Open Roles", f"{int(total_open)}")
+    
+    with col4:
+        st.metric("Closed Roles", f"{int(total_closed)}",
+                 delta=f"{close_rate:.1f}%")
+    
+    with col5:
+        avg_cost = cube.totals['avg_cost']
+        st.metric("Avg Cost/Role", f"${avg_cost/1000:.0f}K")
+    
+    # Tabs (with LAZY_TABS only the open tab is built; each tab reruns on its own as a fragment)
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "📊 Overview",
+        "🎯 Technology Areas", 
+        "💰 Investment Analysis",
+        "📋 Detailed Data"
+    ], key="active_tab", on_change="rerun" if LAZY_TABS else "ignore")
+    
+    with tab1:
+        if tab1.open is not False:
+            render_overview(version, cube, filter_type)
+    
+    with tab2:
+        if tab2.open is not False:
+            render_technology_areas(version, cube, filter_type)
+    
+    with tab3:
+        if tab3.open is not False:
+            render_investment_analysis(version, cube, filter_type)
+    
+    with tab4:
+        if tab4.open is not False:
+            render_detailed_data(version, cube, detailed_df)
     
     # Footer
     st.markdown("---")
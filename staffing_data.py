@@ -0,0 +1,752 @@
+"""
+Staffing Workbook Data Layer
+Shared loading of the staffing workbook for the Streamlit dashboard and the static generator:
+a single-pass, column-pruned reader backed by a columnar (Parquet) snapshot that is only
+rebuilt when the workbook changes
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:
+    import pyarrow  # noqa: F401 - required by DataFrame.to_parquet / read_parquet
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# The staffing workbook read by the dashboard, the static generator and the report generator
+# (STAFFING_WORKBOOK points them all at another workbook, e.g. for the load test)
+FILE_PATH = os.environ.get(
+    'STAFFING_WORKBOOK',
+    r'C:\Users\Eric.Jaffe\OneDrive - First Advantage Corporation\2026 Budget\Global Technology 2026 Staffing Rampup Plan 011226.xlsx'
+)
+
+# Sheet names
+SUMMARY_SHEET = 'Technology Staffing Summary'
+DETAIL_SHEET = 'Detailed 2026 Staffing Plans'
+
+# Columns the dashboard views use; 'full' mode keeps every column (needed for exports)
+SUMMARY_COLUMNS = ['#', 'Technology Area', 'Leaders', '# of New Roles', 'Est. Investment',
+                   'Open Roles', 'Closed Roles', 'Investment Area']
+DETAIL_COLUMNS = ['Technology Area', 'TEAM NAME', 'Worker Type', 'Req ID', 'Recruitment Status',
+                  'Location', 'Senior Leader', 'Hiring Manager', 'Target \nStart Date',
+                  'Target \nEnd Date', 'Actual Start', 'Actual End Date', 'Status', 'Comment', 'Est. Forecast']
+COLUMN_MODES = {
+    'dashboard': (SUMMARY_COLUMNS, DETAIL_COLUMNS),
+    'full': (None, None),
+}
+
+# Detailed-sheet schema: low-cardinality text -> category, role dates -> datetime64, ids -> string,
+# money -> float
+CATEGORICAL_COLUMNS = ['Technology Area', 'TEAM NAME', 'Status', 'Recruitment Status', 'Location',
+                       'Worker Type', 'Senior Leader', 'Hiring Manager']
+DATE_COLUMNS = ['Target \nStart Date', 'Target \nEnd Date', 'Actual Start', 'Actual End Date']
+TEXT_COLUMNS = ['Req ID', 'Comment']
+MONEY_COLUMNS = ['Est. Blended Hourly Rate', 'Est. Forecast']
+# Dtypes a Parquet snapshot round-trips unchanged (it has no seconds unit and its own string type),
+# so fresh and cached loads carry identical frames
+DATE_DTYPE = 'datetime64[ms]'
+CATEGORY_LABEL_DTYPE = pd.StringDtype()
+
+# Columns never shown outside the workbook (exports leave them out)
+HIDDEN_COLUMNS = ['Est. Blended Hourly Rate', 'Est. Forecast']
+# Display names of headers that don't read well as they are
+DISPLAY_NAMES = {'Target \nStart Date': 'Target Start Date', 'Target \nEnd Date': 'Target End Date'}
+# Date-stamped snapshot headers (a date, or text like '2025-12-09T15:45:19z') are shown as MM-DD-YY
+SNAPSHOT_HEADER_FORMAT = '%m-%d-%y'
+SNAPSHOT_HEADER_RE = re.compile(r'(\d{4}-\d{1,2}-\d{1,2})(?:[T ][\d:.]+)?[zZ]?|\d{1,2}/\d{1,2}/\d{2,4}')
+
+# Summary-sheet schema: counts -> nullable integers, money -> float
+SUMMARY_COUNT_COLUMNS = ['#', '# of New Roles', 'Open Roles', 'Closed Roles']
+SUMMARY_MONEY_COLUMNS = ['Est. Investment']
+
+# Header row of each sheet (0-based), matching read_excel(header=1) and read_excel(header=1, skiprows=[0])
+SUMMARY_HEADER_ROW = 1
+DETAIL_HEADER_ROW = 2
+
+# Excel parsing engine: 'openpyxl' (streaming read-only), 'calamine' (requires python-calamine)
+# or 'auto' (calamine when installed and supported by pandas, otherwise openpyxl)
+EXCEL_ENGINES = ('auto', 'openpyxl', 'calamine')
+DEFAULT_ENGINE = os.environ.get('STAFFING_EXCEL_ENGINE', 'auto')
+
+# Snapshot location (one sub-folder per workbook content hash)
+SNAPSHOT_DIR = os.environ.get(
+    'STAFFING_SNAPSHOT_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.staffing_cache', 'snapshots')
+)
+SNAPSHOTS_TO_KEEP = 3
+SNAPSHOT_FORMAT = 4  # Bump when the snapshot layout changes so old snapshots are ignored
+
+# Workbook identity: size and mtime are cheap to check, the hash decides
+WorkbookVersion = namedtuple('WorkbookVersion', ['size', 'mtime_ns', 'sha256'])
+
+
+def _hash_file(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def workbook_version(path):
+    """Return the WorkbookVersion (size, mtime, content hash) of the workbook"""
+    stat = os.stat(path)
+    return WorkbookVersion(stat.st_size, stat.st_mtime_ns, _hash_file(path))
+
+
+def poll_version(path, previous=None):
+    """
+    Return the workbook's current version, hashing the file only when needed.
+
+    If size and mtime still match `previous`, the file is assumed unchanged and
+    `previous` is returned without reading it.
+    """
+    stat = os.stat(path)
+    if previous is not None and (stat.st_size, stat.st_mtime_ns) == (previous.size, previous.mtime_ns):
+        return previous
+    return WorkbookVersion(stat.st_size, stat.st_mtime_ns, _hash_file(path))
+
+
+class WorkbookWatcher:
+    """Process-wide tracker of the workbook's data version, shared by all sessions"""
+
+    def __init__(self, path):
+        self.path = path
+        self.version = None
+        self.reloads = 0           # Polls that found new workbook content
+        self.reloads_avoided = 0   # Scheduled re-reads skipped because the content was unchanged (see avoid_reload)
+        self._lock = threading.Lock()
+
+    def poll(self, force_hash=False):
+        """
+        Check the workbook and return (version, previous_version).
+
+        previous_version is None unless the content changed since the last poll.
+        force_hash re-hashes the file even when size and mtime are unchanged.
+        """
+        with self._lock:
+            previous = self.version
+            current = poll_version(self.path, None if force_hash else previous)
+
+            if previous is not None and current.sha256 == previous.sha256:
+                self.version = current
+                return current, None
+
+            self.reloads += 1
+            self.version = current
+            return current, previous
+
+    def avoid_reload(self):
+        """Record a re-read that a fixed refresh schedule would have done but the unchanged content made unnecessary"""
+        with self._lock:
+            self.reloads_avoided += 1
+
+
+def version_key(version):
+    """Short identifier for a workbook version, used for snapshot folders and cache keys"""
+    return version.sha256[:16]
+
+
+def _column_label(col):
+    """Header label used to match a column against SUMMARY_COLUMNS/DETAIL_COLUMNS"""
+    return col.strip() if isinstance(col, str) else col
+
+
+def _header_names(header):
+    """Column names for a header row, following read_excel's naming of blank and duplicate headers"""
+    names = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = f'Unnamed: {i}' if value is None or (isinstance(value, str) and not value.strip()) else value
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _read_sheet_openpyxl(workbook, sheet_name, header_row, wanted):
+    """Stream one read-only worksheet into a DataFrame, keeping only the wanted columns"""
+    worksheet = workbook[sheet_name]
+
+    header = next(worksheet.iter_rows(min_row=header_row + 1, max_row=header_row + 1, values_only=True), ())
+    # Drop trailing blank header cells (read_excel trims empty trailing columns)
+    header = list(header)
+    while header and header[-1] is None:
+        header.pop()
+    names = _header_names(header)
+
+    if wanted is None:
+        indexes = list(range(len(names)))
+    else:
+        wanted = set(wanted)
+        indexes = [i for i, name in enumerate(names) if _column_label(name) in wanted]
+    if not indexes:
+        return pd.DataFrame(columns=[names[i] for i in indexes])
+
+    # Only parse up to the last wanted column - the date-stamped columns sit at the far right
+    max_col = indexes[-1] + 1
+    values = [[] for _ in indexes]
+    last_filled = 0
+    for row in worksheet.iter_rows(min_row=header_row + 2, max_col=max_col, values_only=True):
+        filled = False
+        for column, i in zip(values, indexes):
+            value = row[i] if i < len(row) else None
+            if value is None:
+                value = ''  # read_excel hands blank cells to its parser as empty strings (an NA value)
+            else:
+                filled = True
+            column.append(value)
+        if filled:
+            last_filled = len(values[0])
+
+    # Trailing blank rows are trimmed, blank rows inside the data are kept (as read_excel does).
+    # The rows then go through read_excel's own TextParser, so NA strings ('N/A', 'null', ...) and
+    # numeric text (' 1002 ') convert exactly as they do under the calamine engine
+    rows = list(zip(*(column[:last_filled] for column in values)))
+    parser = TextParser(rows, names=[names[i] for i in indexes], header=None, skip_blank_lines=False)
+    try:
+        return parser.read()
+    finally:
+        parser.close()
+
+
+def _read_workbook_openpyxl(path, summary_columns, detail_columns):
+    from openpyxl import load_workbook as open_workbook
+
+    workbook = open_workbook(path, read_only=True, data_only=True)
+    try:
+        summary_df = _read_sheet_openpyxl(workbook, SUMMARY_SHEET, SUMMARY_HEADER_ROW, summary_columns)
+        detailed_df = _read_sheet_openpyxl(workbook, DETAIL_SHEET, DETAIL_HEADER_ROW, detail_columns)
+    finally:
+        workbook.close()
+    return summary_df, detailed_df
+
+
+def _read_workbook_calamine(path, summary_columns, detail_columns):
+    def usecols(wanted):
+        if wanted is None:
+            return None
+        wanted = set(wanted)
+        return lambda col: _column_label(col) in wanted
+
+    with pd.ExcelFile(path, engine='calamine') as xls:
+        summary_df = xls.parse(SUMMARY_SHEET, header=SUMMARY_HEADER_ROW, usecols=usecols(summary_columns))
+        detailed_df = xls.parse(DETAIL_SHEET, header=1, skiprows=[0], usecols=usecols(detail_columns))
+    return summary_df, detailed_df
+
+
+def calamine_available():
+    """True if python-calamine is installed and pandas can use it (pandas 2.2 and later)"""
+    major, minor = (int(part) for part in re.findall(r'\d+', pd.__version__)[:2])
+    if (major, minor) < (2, 2):
+        return False
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_engine(engine=None):
+    """Return the concrete Excel engine to use for a requested engine name"""
+    engine = engine or DEFAULT_ENGINE
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"Unknown Excel engine {engine!r}, expected one of {EXCEL_ENGINES}")
+    if engine == 'auto':
+        return 'calamine' if calamine_available() else 'openpyxl'
+    if engine == 'calamine' and not calamine_available():
+        raise ValueError(f"The calamine engine needs python-calamine and pandas 2.2+ (pandas {pd.__version__} installed)")
+    return engine
+
+
+def read_workbook(path, columns='dashboard', engine=None):
+    """
+    Parse both sheets from the Excel workbook in a single open.
+
+    columns: 'dashboard' keeps only the columns the views use, 'full' keeps every column.
+    engine: 'auto' (default), 'openpyxl' or 'calamine'.
+    """
+    if columns not in COLUMN_MODES:
+        raise ValueError(f"Unknown column mode {columns!r}, expected one of {sorted(COLUMN_MODES)}")
+    engine = resolve_engine(engine)
+
+    summary_columns, detail_columns = COLUMN_MODES[columns]
+    if engine == 'calamine':
+        return _read_workbook_calamine(path, summary_columns, detail_columns)
+    return _read_workbook_openpyxl(path, summary_columns, detail_columns)
+
+
+def prune_columns(summary_df, detailed_df, columns='dashboard'):
+    """Reduce frames read in 'full' mode to the columns of another column mode"""
+    summary_columns, detail_columns = COLUMN_MODES[columns]
+    if summary_columns is not None:
+        wanted = set(summary_columns)
+        summary_df = summary_df[[c for c in summary_df.columns if _column_label(c) in wanted]]
+    if detail_columns is not None:
+        wanted = set(detail_columns)
+        detailed_df = detailed_df[[c for c in detailed_df.columns if _column_label(c) in wanted]]
+    return summary_df, detailed_df
+
+
+def clean_summary(summary_df):
+    """Drop empty summary rows and convert the numeric columns"""
+    if '#' in summary_df.columns:
+        summary_df = summary_df[summary_df['#'].notna()].copy()  # Remove empty rows
+
+    # Convert numeric columns to proper types
+    numeric_cols = ['# of New Roles', 'Est. Investment', 'Open Roles', 'Closed Roles']
+    for col in numeric_cols:
+        if col in summary_df.columns:
+            summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce').fillna(0)
+
+    return summary_df
+
+
+def prepare_detail(detailed_df):
+    """Remove empty rows from the detailed roles sheet (columns are already typed by the schema)"""
+    if 'Technology Area' in detailed_df.columns:
+        detailed_df = detailed_df[detailed_df['Technology Area'].notna()].reset_index(drop=True)
+    return detailed_df
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def _to_text(series):
+    """Convert a column to the nullable string dtype (whole-number floats lose their '.0')"""
+    def as_text(value):
+        if pd.isna(value):
+            return pd.NA
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value).strip()
+
+    return series.map(as_text).astype('string')
+
+
+def _to_category(series):
+    """Convert a column of labels to a categorical"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    text = _to_text(series)
+    return text.mask(text == '').astype('category')
+
+
+def _to_count(series):
+    """Convert a column to nullable integers, or floats if it holds fractions"""
+    numbers = pd.to_numeric(series, errors='coerce')
+    whole = numbers.dropna()
+    if (whole == whole.round()).all():
+        return numbers.astype('Int64')
+    return numbers.astype('float64')
+
+
+def normalize_detail_dtypes(detailed_df):
+    """
+    Give the typed detail columns the exact dtypes every load path shares: DATE_DTYPE dates and
+    categoricals with CATEGORY_LABEL_DTYPE labels (changes detailed_df in place and returns it)
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in detailed_df.columns and isinstance(detailed_df[col].dtype, pd.CategoricalDtype):
+            series = detailed_df[col]
+            if series.cat.categories.dtype != CATEGORY_LABEL_DTYPE:
+                categories = series.cat.categories.astype(CATEGORY_LABEL_DTYPE)
+                detailed_df[col] = pd.Series(pd.Categorical.from_codes(series.cat.codes, categories),
+                                             index=series.index, name=series.name)
+    for col in DATE_COLUMNS:
+        if col in detailed_df.columns and pd.api.types.is_datetime64_any_dtype(detailed_df[col]) \
+                and detailed_df[col].dtype != DATE_DTYPE:
+            detailed_df[col] = detailed_df[col].astype(DATE_DTYPE)
+    return detailed_df
+
+
+def apply_detail_schema(detailed_df):
+    """Return the detailed roles frame with compact, typed columns"""
+    detailed_df = detailed_df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in detailed_df.columns:
+            detailed_df[col] = _to_category(detailed_df[col])
+    for col in DATE_COLUMNS:
+        if col in detailed_df.columns:
+            detailed_df[col] = pd.to_datetime(detailed_df[col], errors='coerce')
+    for col in TEXT_COLUMNS:
+        if col in detailed_df.columns:
+            detailed_df[col] = _to_text(detailed_df[col])
+    for col in MONEY_COLUMNS:
+        if col in detailed_df.columns:
+            detailed_df[col] = pd.to_numeric(detailed_df[col], errors='coerce').astype('float64')
+    return normalize_detail_dtypes(detailed_df)
+
+
+def apply_summary_schema(summary_df):
+    """Return the summary frame with nullable integer counts and float money columns"""
+    summary_df = summary_df.copy()
+    for col in SUMMARY_COUNT_COLUMNS:
+        if col in summary_df.columns:
+            summary_df[col] = _to_count(summary_df[col])
+    for col in SUMMARY_MONEY_COLUMNS:
+        if col in summary_df.columns:
+            summary_df[col] = pd.to_numeric(summary_df[col], errors='coerce').astype('float64')
+    return summary_df
+
+
+def isin_mask(series, values):
+    """
+    Boolean numpy mask of series.isin(values); categorical columns are matched on their
+    integer codes through a lookup table instead of comparing strings
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.isin(values).to_numpy()
+    categories = series.cat.categories
+    codes = categories.get_indexer(list(values))
+    lookup = np.zeros(len(categories) + 1, dtype=bool)  # Last slot catches code -1 (missing)
+    lookup[codes[codes >= 0]] = True
+    return lookup[series.cat.codes.to_numpy()]
+
+
+def check_schema(summary_df, detailed_df):
+    """Return a list of human-readable schema problems (empty when both frames look right)"""
+    issues = []
+    for col in ['Technology Area'] + SUMMARY_COUNT_COLUMNS[1:] + SUMMARY_MONEY_COLUMNS:
+        if col not in summary_df.columns:
+            issues.append(f"Summary sheet is missing column '{col}'")
+    for col in ['Technology Area', 'TEAM NAME', 'Status']:
+        if col not in detailed_df.columns:
+            issues.append(f"Detailed sheet is missing column '{col}'")
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in detailed_df.columns and not isinstance(detailed_df[col].dtype, pd.CategoricalDtype):
+            issues.append(f"'{col}' is {detailed_df[col].dtype}, expected category")
+    for col in DATE_COLUMNS:
+        if col in detailed_df.columns and not pd.api.types.is_datetime64_any_dtype(detailed_df[col]):
+            issues.append(f"'{col}' is {detailed_df[col].dtype}, expected datetime64")
+    for col in SUMMARY_COUNT_COLUMNS:
+        if col in summary_df.columns and not pd.api.types.is_numeric_dtype(summary_df[col]):
+            issues.append(f"'{col}' is {summary_df[col].dtype}, expected a number")
+    return issues
+
+
+# ---------------------------------------------------------------------------
+# Column map
+# ---------------------------------------------------------------------------
+
+# Kinds of detail-sheet column
+SNAPSHOT, DATE, NUMERIC, CATEGORICAL, TEXT, HIDDEN = 'snapshot', 'date', 'numeric', 'categorical', 'text', 'hidden'
+
+ColumnInfo = namedtuple('ColumnInfo', ['display', 'kind'])
+
+
+def snapshot_date(col):
+    """The date a date-stamped header stands for (datetime labels or date text), else None"""
+    if isinstance(col, (datetime, pd.Timestamp)):
+        return pd.Timestamp(col)
+    if not isinstance(col, str):
+        return None
+    match = SNAPSHOT_HEADER_RE.fullmatch(col.strip())
+    if match is None:
+        return None
+    stamp = pd.to_datetime(match.group(1) or match.group(0), errors='coerce')
+    return None if pd.isna(stamp) else stamp
+
+
+def classify_column(col, series):
+    """ColumnInfo (display name, kind) of one detail-sheet column"""
+    stamp = snapshot_date(col)
+    if col in HIDDEN_COLUMNS:
+        kind = HIDDEN
+    elif stamp is not None:
+        kind = SNAPSHOT
+    elif col in DATE_COLUMNS or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        kind = DATE
+    elif col in CATEGORICAL_COLUMNS or isinstance(series.dtype, pd.CategoricalDtype):
+        kind = CATEGORICAL
+    elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        kind = NUMERIC
+    else:
+        kind = TEXT
+    if stamp is not None:
+        display = stamp.strftime(SNAPSHOT_HEADER_FORMAT)
+    else:
+        display = DISPLAY_NAMES.get(col, col if isinstance(col, str) else str(col))
+    return ColumnInfo(display, kind)
+
+
+class ColumnMap:
+    """
+    Kind and display name of every column of a frame, worked out once per data version so
+    exports, tables and charts never re-parse headers. Kinds: SNAPSHOT (date-stamped status
+    columns), DATE, NUMERIC, CATEGORICAL, TEXT and HIDDEN (never exported).
+    """
+
+    def __init__(self, df):
+        self.info = {col: classify_column(col, df.iloc[:, i]) for i, col in enumerate(df.columns)}
+
+    def display(self, col):
+        """Display name of a column (the label itself for columns the map doesn't know)"""
+        info = self.info.get(col)
+        return info.display if info is not None else str(col)
+
+    def kind(self, col):
+        info = self.info.get(col)
+        return info.kind if info is not None else None
+
+    def columns(self, *kinds):
+        """Columns of the given kinds, in frame order"""
+        return [col for col, info in self.info.items() if info.kind in kinds]
+
+    def visible(self, columns=None):
+        """The columns (all by default) that aren't hidden"""
+        columns = self.info if columns is None else columns
+        return [col for col in columns if self.kind(col) != HIDDEN]
+
+    def renames(self, columns=None):
+        """{column: display name} for the columns (all by default) whose display name differs"""
+        columns = self.info if columns is None else columns
+        return {col: self.display(col) for col in columns if self.display(col) != col}
+
+    def display_frame(self, df):
+        """df without its hidden columns and with display names as headers (a new frame)"""
+        visible = self.visible(df.columns)
+        return df[visible].set_axis([self.display(col) for col in visible], axis=1)
+
+
+# ---------------------------------------------------------------------------
+# Parquet snapshot
+# ---------------------------------------------------------------------------
+
+def _encode_column_name(col):
+    """Encode a column label so it survives the round trip through the snapshot manifest"""
+    if isinstance(col, (datetime, pd.Timestamp)):
+        return {'type': 'datetime', 'value': pd.Timestamp(col).isoformat()}
+    if isinstance(col, bool):
+        return {'type': 'str', 'value': str(col)}
+    if isinstance(col, int):
+        return {'type': 'int', 'value': col}
+    if isinstance(col, float):
+        return {'type': 'float', 'value': col}
+    return {'type': 'str', 'value': str(col)}
+
+
+def _decode_column_name(encoded):
+    """Inverse of _encode_column_name"""
+    if encoded['type'] == 'datetime':
+        return pd.Timestamp(encoded['value']).to_pydatetime()
+    return encoded['value']
+
+
+def _to_columnar(df):
+    """Return a copy of df that Parquet can store, plus the encoded original column names"""
+    names = [_encode_column_name(col) for col in df.columns]
+    out = df.copy()
+    out.columns = [f'c{i}' for i in range(len(df.columns))]
+
+    # Excel columns often mix numbers, text and dates - store those as text
+    for col in out.columns:
+        if out[col].dtype == object:
+            kind = pd.api.types.infer_dtype(out[col], skipna=True)
+            if kind not in ('string', 'empty', 'boolean', 'integer', 'floating', 'datetime', 'date'):
+                out[col] = out[col].map(lambda v: v if pd.isna(v) else str(v)).astype(object)
+
+    return out.reset_index(drop=True), names
+
+
+def _from_columnar(df, names):
+    """Restore the original column labels of a snapshot frame"""
+    df.columns = [_decode_column_name(n) for n in names]
+    return df
+
+
+def _snapshot_path(version, columns):
+    return os.path.join(SNAPSHOT_DIR, version_key(version), columns)
+
+
+def read_snapshot(version, columns='dashboard'):
+    """Return (summary_df, detailed_df) from the snapshot for this version, or None if missing"""
+    if not PARQUET_AVAILABLE:
+        return None
+
+    folder = _snapshot_path(version, columns)
+    manifest_file = os.path.join(folder, 'manifest.json')
+    if not os.path.exists(manifest_file):
+        return None
+
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != SNAPSHOT_FORMAT or manifest.get('sha256') != version.sha256:
+            return None
+
+        summary_df = _from_columnar(pd.read_parquet(os.path.join(folder, 'summary.parquet')), manifest['summary_columns'])
+        detailed_df = _from_columnar(pd.read_parquet(os.path.join(folder, 'detail.parquet')), manifest['detail_columns'])
+        return summary_df, normalize_detail_dtypes(detailed_df)
+    except Exception:
+        # A damaged snapshot is never fatal - the workbook is re-parsed instead
+        return None
+
+
+def has_snapshot(version, columns='dashboard'):
+    """True if a current-format snapshot of this version exists (only its manifest is read)"""
+    try:
+        with open(os.path.join(_snapshot_path(version, columns), 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return manifest.get('format') == SNAPSHOT_FORMAT and manifest.get('sha256') == version.sha256
+
+
+def read_row_index(version, columns='dashboard'):
+    """Return the row keys/hashes stored beside a snapshot (see staffing_ingest), or None"""
+    if not PARQUET_AVAILABLE:
+        return None
+    try:
+        return pd.read_parquet(os.path.join(_snapshot_path(version, columns), 'rows.parquet'))
+    except Exception:
+        return None
+
+
+def write_snapshot(version, summary_df, detailed_df, columns='dashboard', row_index=None):
+    """Write the snapshot for this version atomically and prune older snapshots"""
+    if not PARQUET_AVAILABLE:
+        return
+
+    folder = _snapshot_path(version, columns)
+    tmp_folder = f'{folder}.tmp-{os.getpid()}'
+    try:
+        os.makedirs(tmp_folder, exist_ok=True)
+
+        summary_out, summary_names = _to_columnar(summary_df)
+        detail_out, detail_names = _to_columnar(detailed_df)
+        summary_out.to_parquet(os.path.join(tmp_folder, 'summary.parquet'), index=False)
+        detail_out.to_parquet(os.path.join(tmp_folder, 'detail.parquet'), index=False)
+        if row_index is not None:
+            row_index.to_parquet(os.path.join(tmp_folder, 'rows.parquet'), index=False)
+
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'size': version.size,
+            'mtime_ns': version.mtime_ns,
+            'sha256': version.sha256,
+            'columns': columns,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'summary_columns': summary_names,
+            'detail_columns': detail_names,
+        }
+        with open(os.path.join(tmp_folder, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        if os.path.exists(folder):
+            shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp_folder, folder)
+    except Exception as e:
+        # Snapshot failures only cost speed, never correctness
+        print(f"Warning: could not write snapshot: {e}")
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        return
+
+    _prune_snapshots()
+
+
+def latest_snapshot(columns='dashboard'):
+    """
+    Return (version, created) of the newest snapshot on disk for a column mode, or None.
+    Used to serve the last good data when the workbook itself can't be read.
+    """
+    newest = None
+    try:
+        names = os.listdir(SNAPSHOT_DIR)
+    except OSError:
+        return None
+
+    for name in names:
+        manifest_file = os.path.join(SNAPSHOT_DIR, name, columns, 'manifest.json')
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if manifest.get('format') != SNAPSHOT_FORMAT:
+            continue
+        created = datetime.fromisoformat(manifest['created'])
+        if newest is None or created > newest[1]:
+            version = WorkbookVersion(manifest['size'], manifest['mtime_ns'], manifest['sha256'])
+            newest = (version, created)
+    return newest
+
+
+def _prune_snapshots():
+    """Keep only the most recent SNAPSHOTS_TO_KEEP snapshots"""
+    try:
+        entries = [
+            os.path.join(SNAPSHOT_DIR, name) for name in os.listdir(SNAPSHOT_DIR)
+            if os.path.isdir(os.path.join(SNAPSHOT_DIR, name)) and '.tmp-' not in name
+        ]
+    except OSError:
+        return
+
+    entries.sort(key=os.path.getmtime, reverse=True)
+    for old in entries[SNAPSHOTS_TO_KEEP:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def load_workbook(path, version=None, columns='dashboard', engine=None, ingester=None):
+    """
+    Return (summary_df, detailed_df, version) for the workbook.
+
+    The Excel file is only parsed when no snapshot exists for its current content;
+    otherwise both sheets come straight from the Parquet snapshot. Either way the
+    frames carry the typed schema (see apply_detail_schema). Pass a version
+    already obtained from poll_version/WorkbookWatcher to skip re-hashing the file.
+
+    With a staffing_ingest.IncrementalIngester, a fresh parse only re-types the detail
+    rows that changed since the ingester's last version.
+    """
+    if version is None:
+        version = workbook_version(path)
+
+    frames = read_snapshot(version, columns)
+    if frames is not None:
+        if ingester is not None:
+            ingester.prime(version, frames[1], read_row_index(version, columns))
+    elif columns != 'full':
+        # A full snapshot already holds every column of the smaller modes
+        full = read_snapshot(version, 'full')
+        if full is not None:
+            frames = prune_columns(*full, columns=columns)
+
+    if frames is None:
+        summary_df, detailed_df = read_workbook(path, columns=columns, engine=engine)
+        summary_df = apply_summary_schema(summary_df)
+        detailed_df = ingester.ingest(detailed_df) if ingester is not None else apply_detail_schema(detailed_df)
+        frames = summary_df, detailed_df
+        # The file may have been saved again while it was being parsed: the frames are only
+        # cached when the content is still the one that was parsed (the watcher picks up the rest)
+        current = poll_version(path, version)
+        if current.sha256 != version.sha256:
+            return summary_df, detailed_df, version
+        version = current
+        if ingester is not None:
+            ingester.version = version
+        write_snapshot(version, *frames, columns=columns,
+                       row_index=ingester.row_index() if ingester is not None else None)
+        if columns == 'full' and not has_snapshot(version, 'dashboard'):
+            # Never replace a dashboard snapshot: the ingester's row index is stored beside it
+            write_snapshot(version, *prune_columns(*frames), columns='dashboard')
+
+    summary_df, detailed_df = frames
+    return summary_df, detailed_df, version
@@ -0,0 +1,355 @@
+"""
+Staffing Excel Export
+Branded Excel downloads (green header row, auto-filter, borders, mm/dd/yyyy dates) for the
+dashboard's summary and detailed roles data, plus CSV and Parquet exports of the filtered view.
+
+The .xlsx is written by XlsxWriter in constant_memory mode: each row is flushed to a temporary
+file as soon as it is written, so the sheets are never held as cell objects, and every cell
+uses one of three shared named formats (FA Header, FA Body, FA Date) instead of its own.
+The finished file is returned as bytes - it is what gets downloaded - and kept in a
+size-bounded cache keyed by data version and export options, so it is only built when
+first downloaded.
+"""
+
+import datetime as dt
+import decimal
+import math
+import numbers
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from staffing_data import PARQUET_AVAILABLE, ColumnMap
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# Formats offered for the filtered view: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'Excel': ('xlsx', XLSX_MIME),
+    'CSV': ('csv', 'text/csv'),
+}
+if PARQUET_AVAILABLE:
+    EXPORT_FORMATS['Parquet'] = ('parquet', 'application/vnd.apache.parquet')
+# Dates in CSV exports, matching the Excel number format
+CSV_DATE_FORMAT = '%m/%d/%Y'
+
+# Upper bound on the total size of the cached export files (bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Rows converted to cell values and written per block
+ROWS_PER_BLOCK = 10_000
+# Column widths are the longest value (or header) plus padding, capped
+MAX_COLUMN_WIDTH = 50
+WIDTH_PADDING = 2
+# Width of a date shown as mm/dd/yyyy
+DATE_WIDTH = 10
+
+# The shared cell formats, by name
+NAMED_FORMATS = {
+    'FA Header': {'bold': True, 'font_size': 12, 'font_color': '#FFFFFF', 'bg_color': '#00A84F',
+                  'border': 1, 'align': 'center', 'valign': 'vcenter'},
+    'FA Body': {'border': 1},
+    'FA Date': {'border': 1, 'num_format': 'mm/dd/yyyy'},
+}
+WORKBOOK_OPTIONS = {
+    'constant_memory': True,
+    'remove_timezone': True,
+    # Cell text is data: never turn it into formulas, links or numbers
+    'strings_to_formulas': False,
+    'strings_to_urls': False,
+    'strings_to_numbers': False,
+}
+# Fixed creation time in the document properties, so the same data gives the same bytes
+CREATED = dt.datetime(1980, 1, 1)
+# Years Excel can show as dates; dates outside them are written as text
+EXCEL_YEARS = range(1900, 10000)
+
+
+def export_frame(df, columns=None):
+    """
+    Drop the hidden columns and use display names as headers - date-stamped headers as MM-DD-YY
+    (returns a new frame). columns is the data version's ColumnMap; without one, the frame's
+    columns are classified here.
+    """
+    return (columns if columns is not None else ColumnMap(df)).display_frame(df)
+
+
+def excel_bytes(export_df, sheet_name):
+    """Write export_df to a single-sheet, branded .xlsx and return the file contents"""
+    return workbook_bytes({sheet_name: export_df})
+
+
+def workbook_bytes(sheets):
+    """
+    Write a branded .xlsx with one sheet per (name, frame) of the `sheets` dict, in order, and
+    return the file contents
+    """
+    buffer = BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, WORKBOOK_OPTIONS)
+    try:
+        workbook.set_properties({'created': CREATED})
+        formats = {name: workbook.add_format(properties) for name, properties in NAMED_FORMATS.items()}
+        for name, frame in sheets.items():
+            _write_sheet(workbook.add_worksheet(name), frame, formats)
+    finally:
+        workbook.close()
+    return buffer.getvalue()
+
+
+def csv_bytes(export_df):
+    """
+    export_df as UTF-8 CSV (with a byte order mark so Excel detects the encoding), dates as
+    mm/dd/yyyy. Written by pyarrow's multi-threaded CSV writer when it is installed.
+    """
+    if not PARQUET_AVAILABLE:
+        return export_df.to_csv(index=False, date_format=CSV_DATE_FORMAT).encode('utf-8-sig')
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+
+    table = pa.Table.from_pandas(_columnar(export_df), preserve_index=False)
+    columns = []
+    for column, field in zip(table.columns, table.schema):
+        if pa.types.is_timestamp(field.type) or pa.types.is_date(field.type):
+            column = pc.strftime(column, format=CSV_DATE_FORMAT)
+        elif pa.types.is_dictionary(field.type):
+            column = column.cast(field.type.value_type)
+        columns.append(column)
+    buffer = BytesIO()
+    buffer.write('\ufeff'.encode('utf-8'))
+    pa_csv.write_csv(pa.table(columns, names=table.column_names), buffer)
+    return buffer.getvalue()
+
+
+def parquet_bytes(export_df):
+    """export_df as a Parquet file (column types, including categories, are preserved)"""
+    buffer = BytesIO()
+    _columnar(export_df).to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _columnar(df):
+    """df with text column labels and mixed-type columns (numbers, text and dates) stored as text"""
+    mixed = {col: df[col].map(lambda v: v if pd.isna(v) else str(v)).astype(object)
+             for col in df.columns[df.dtypes == object]
+             if pd.api.types.infer_dtype(df[col], skipna=True) not in
+             ('string', 'empty', 'boolean', 'integer', 'floating', 'datetime', 'date')}
+    df = df.assign(**mixed) if mixed else df
+    return df.set_axis([str(col) for col in df.columns], axis=1)
+
+
+def export_bytes(export_format, sheets):
+    """
+    Contents of an export in one of EXPORT_FORMATS. Excel gets every sheet of the `sheets`
+    dict; CSV and Parquet hold a single table, so only the first sheet is written.
+    """
+    if export_format == 'Excel':
+        return workbook_bytes(sheets)
+    first = next(iter(sheets.values()))
+    if export_format == 'CSV':
+        return csv_bytes(first)
+    if export_format == 'Parquet':
+        return parquet_bytes(first)
+    raise ValueError(f"Unknown export format {export_format!r} (expected one of {', '.join(EXPORT_FORMATS)})")
+
+
+class ExportCache:
+    """
+    LRU of generated export files (bytes) keyed by data version and export options.
+    file(key, build) returns the file for the key, calling build() only on a miss - once,
+    even when several sessions ask for it at the same time; least recently used files are
+    evicted once their total size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._files = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {}  # key -> Lock held while the file is built
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def peek(self, key):
+        """The cached file, or None if it hasn't been generated (or was evicted)"""
+        with self._lock:
+            data = self._files.get(key)
+            if data is not None:
+                self._files.move_to_end(key)
+            return data
+
+    def file(self, key, build):
+        data = self._get(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            lock = self._building.setdefault(key, threading.Lock())
+        with lock:
+            data = self._get(key)  # Built by another session while this one waited
+            if data is None:
+                with self._lock:
+                    self.misses += 1
+                data = build()
+                self._put(key, data)
+            with self._lock:
+                self._building.pop(key, None)
+        return data
+
+    def _get(self, key):
+        with self._lock:
+            data = self._files.get(key)
+            if data is not None:
+                self._files.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def _put(self, key, data):
+        with self._lock:
+            if key in self._files:
+                return
+            self._files[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._files) > 1:
+                _, evicted = self._files.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        """Counters for display: hits, misses, evictions, entries and bytes"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._files), 'bytes': self._bytes}
+
+
+# --- Sheets ------------------------------------------------------------------------------
+
+def _write_sheet(worksheet, df, formats):
+    """Write df with a header row, column widths and an auto-filter, one row at a time"""
+    for i, width in enumerate(column_widths(df)):
+        worksheet.set_column(i, i, width)
+    for i, col in enumerate(df.columns):
+        worksheet.write_string(0, i, str(col), formats['FA Header'])
+
+    # constant_memory needs whole rows in order, so a block of rows is converted column by column
+    # and then written row by row
+    writers = {kind: getattr(worksheet, f'write_{kind}') for kind in CELL_KINDS}
+    for start in range(0, len(df), ROWS_PER_BLOCK):
+        block = df.iloc[start:start + ROWS_PER_BLOCK]
+        columns = []
+        for i in range(len(df.columns)):
+            kinds, values = _column_cells(block.iloc[:, i])
+            columns.append(([writers[kind] for kind in kinds], values,
+                            [formats['FA Date'] if kind == 'datetime' else formats['FA Body'] for kind in kinds]))
+        for offset in range(len(block)):
+            row = start + offset + 1
+            for i, (cell_writers, values, cell_formats) in enumerate(columns):
+                cell_writers[offset](row, i, values[offset], cell_formats[offset])
+
+    if len(df.columns):
+        worksheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+
+
+# How a cell is written: the worksheet.write_<kind> method it goes through
+CELL_KINDS = ('blank', 'boolean', 'number', 'datetime', 'string')
+
+
+def _column_cells(values):
+    """
+    One column as (kinds, values) lists: missing and non-finite values are bordered blanks,
+    and dates Excel can't show are written as text
+    """
+    kind = _column_kind(values)
+    present = values.notna().to_numpy()
+    if kind == 'number':
+        present = present & np.isfinite(values.to_numpy(dtype='float64', na_value=np.nan))
+    elif kind == 'bool':
+        kind = 'boolean'
+    elif kind == 'text':
+        kind = 'string'
+    else:
+        cells = [_cell_value(value) for value in values.astype(object).where(present, None).tolist()]
+        return [kind for kind, _ in cells], [value for _, value in cells]
+    return ([kind if flag else 'blank' for flag in present.tolist()],
+            values.astype(object).where(present, None).tolist())
+
+
+def _cell_value(value):
+    """(kind, value) of a single value as written to the sheet"""
+    if value is None:
+        return 'blank', None
+    if isinstance(value, (bool, np.bool_)):
+        return 'boolean', bool(value)
+    if isinstance(value, (numbers.Real, decimal.Decimal)):
+        return ('number', value) if math.isfinite(value) else ('blank', None)
+    if isinstance(value, np.datetime64):
+        try:
+            value = pd.Timestamp(value)
+        except (ValueError, OverflowError):
+            return 'string', str(value)
+    if isinstance(value, dt.date):
+        if value.year in EXCEL_YEARS:
+            return 'datetime', value
+        return 'string', value.isoformat()
+    return 'string', str(value)
+
+
+def _number_text(values):
+    """Numbers as written to the sheet (integers stay integers), with a mask of the finite ones"""
+    if values.dtype == object:
+        values = pd.to_numeric(values)
+    if not pd.api.types.is_integer_dtype(values.dtype) or values.isna().any():
+        values = values.astype('float64')
+    finite = pd.Series(np.isfinite(values.to_numpy(dtype='float64', na_value=np.nan)), index=values.index)
+    return values.astype(str), finite
+
+
+def _column_kind(values):
+    """'bool', 'number', 'date', 'text' or 'mixed' (object columns, sorted out value by value)"""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _column_kind(pd.Series(dtype.categories)) if len(dtype.categories) else 'text'
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'number'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'date'
+    if pd.api.types.is_string_dtype(dtype) and dtype != object:
+        return 'text'
+    return 'mixed'
+
+
+def column_widths(df):
+    """
+    Excel column widths for df: the longest header or value as displayed (dates as mm/dd/yyyy)
+    plus padding, capped at MAX_COLUMN_WIDTH. Computed from whole columns at once.
+    """
+    widths = []
+    for i, col in enumerate(df.columns):
+        values = df.iloc[:, i]
+        kind = _column_kind(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Only the categories in use need measuring
+            values = pd.Series(values.dtype.categories[np.unique(values.cat.codes[values.cat.codes >= 0])])
+        values = values.dropna()
+        longest = len(str(col))
+        if kind == 'date':
+            longest = max(longest, DATE_WIDTH)
+        elif len(values):
+            if kind == 'number':
+                text, finite = _number_text(values)
+                text = text[finite]
+            elif kind == 'bool':
+                text = pd.Series(['FALSE'])
+            else:
+                text = values.astype('string')
+            if len(text):
+                longest = max(longest, int(text.str.len().max()))
+        widths.append(min(longest + WIDTH_PADDING, MAX_COLUMN_WIDTH))
+    return widths
@@ -0,0 +1,63 @@
+"""
+Staffing Figure Cache
+Process-wide, size-bounded cache of Plotly figure specs keyed by data version and view
+parameters, so charts are built once per workbook version instead of on every rerun
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+# Upper bound on the total size of the cached figure specs (bytes of JSON)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class FigureCache:
+    """
+    LRU of Plotly figure specs (plain dicts, as st.plotly_chart accepts them). figure(key, build)
+    returns the spec for the key, calling build() only on a miss; least recently used specs are
+    evicted once their total JSON size exceeds max_bytes. Specs are shared by every session
+    and must not be modified.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._specs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def figure(self, key, build):
+        with self._lock:
+            entry = self._specs.get(key)
+            if entry is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            data = build().to_json()
+            entry = (json.loads(data), len(data))
+            entry = self._put(key, entry)
+        return entry[0]
+
+    def _put(self, key, entry):
+        with self._lock:
+            if key in self._specs:
+                return self._specs[key]
+            self._specs[key] = entry
+            self._bytes += entry[1]
+            while self._bytes > self.max_bytes and len(self._specs) > 1:
+                _, (_, size) = self._specs.popitem(last=False)
+                self._bytes -= size
+                self.evictions += 1
+            return entry
+
+    def stats(self):
+        """Counters for display: hits, misses, evictions, entries and bytes"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._specs), 'bytes': self._bytes}
@@ -0,0 +1,171 @@
+"""
+Staffing History Store
+Append-only, deduplicated record of every workbook version: the role rows that changed
+and a per-Technology Area rollup of open/closed roles, for hiring-ramp trend views
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from staffing_data import PARQUET_AVAILABLE, version_key
+
+HISTORY_DIR = os.environ.get(
+    'STAFFING_HISTORY_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.staffing_cache', 'history')
+)
+# Role fields kept per change (enough to rebuild the ramp by area, team and status)
+HISTORY_COLUMNS = ['Technology Area', 'TEAM NAME', 'Status', 'Recruitment Status', 'Location',
+                   'Worker Type', 'Actual Start']
+# Merge rollup part files once there are this many, so reads stay a single small file
+COMPACT_AFTER_PARTS = 50
+
+
+def area_rollup(detailed_df):
+    """Total, open and closed roles per Technology Area ('Closed' status counts as closed)"""
+    if 'Technology Area' not in detailed_df.columns:
+        return pd.DataFrame(columns=['Technology Area', 'total', 'open', 'closed'])
+    areas = detailed_df['Technology Area']
+    closed = (detailed_df['Status'] == 'Closed') if 'Status' in detailed_df.columns else pd.Series(False, index=detailed_df.index)
+    rollup = pd.DataFrame({'Technology Area': areas.astype('string'), 'closed': closed.fillna(False).astype('int64')})
+    rollup = rollup[rollup['Technology Area'].notna()]
+    rollup = rollup.groupby('Technology Area', sort=True).agg(total=('closed', 'size'), closed=('closed', 'sum')).reset_index()
+    rollup['open'] = rollup['total'] - rollup['closed']
+    return rollup[['Technology Area', 'total', 'open', 'closed']]
+
+
+class HistoryStore:
+    """
+    Folder layout:
+      versions.jsonl    one line per recorded workbook version (the dedup index)
+      roles/*.parquet   changed role rows per version (op = 'upsert' or 'delete')
+      rollups/*.parquet per-area totals per version
+    """
+
+    def __init__(self, folder=HISTORY_DIR):
+        self.folder = folder
+        self._lock = threading.Lock()
+        self._recorded = None
+        self._rollups = None
+        self._rollup_parts = None
+
+    @property
+    def enabled(self):
+        return PARQUET_AVAILABLE
+
+    def _versions_file(self):
+        return os.path.join(self.folder, 'versions.jsonl')
+
+    def recorded_versions(self):
+        """Content hashes of every version already in the store"""
+        if self._recorded is None:
+            recorded = set()
+            try:
+                with open(self._versions_file(), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            recorded.add(json.loads(line)['sha256'])
+            except OSError:
+                pass
+            self._recorded = recorded
+        return self._recorded
+
+    def record(self, version, detailed_df, keys, changes=None):
+        """
+        Append one workbook version. `keys` are the row keys aligned with detailed_df and
+        `changes` the staffing_ingest.RowChanges against the previous version (None stores
+        every row, e.g. for the first version). Returns False if the version was already stored.
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            if version.sha256 in self.recorded_versions():
+                return False
+
+            as_of = datetime.fromtimestamp(version.mtime_ns / 1e9)
+            recorded_at = datetime.now()
+            stamp = f"{as_of.strftime('%Y%m%dT%H%M%S')}-{version_key(version)}"
+
+            # Changed roles only
+            columns = [col for col in HISTORY_COLUMNS if col in detailed_df.columns]
+            roles = detailed_df[columns].copy()
+            roles.insert(0, 'key', keys)
+            if changes is not None:
+                changed = list(changes.inserted) + list(changes.updated)
+                roles = roles[roles['key'].isin(changed)]
+            roles.insert(1, 'op', 'upsert')
+            if changes is not None and len(changes.deleted):
+                deleted = pd.DataFrame({'key': changes.deleted, 'op': 'delete'})
+                roles = pd.concat([roles, deleted], ignore_index=True)
+            for col in roles.columns:
+                if isinstance(roles[col].dtype, pd.CategoricalDtype):
+                    roles[col] = roles[col].astype('string')
+            roles['as_of'] = as_of
+            roles['version'] = version_key(version)
+
+            # Precomputed per-area rollup
+            rollup = area_rollup(detailed_df)
+            rollup['as_of'] = as_of
+            rollup['version'] = version_key(version)
+
+            os.makedirs(os.path.join(self.folder, 'roles'), exist_ok=True)
+            os.makedirs(os.path.join(self.folder, 'rollups'), exist_ok=True)
+            if len(roles):
+                roles.to_parquet(os.path.join(self.folder, 'roles', f'{stamp}.parquet'), index=False)
+            rollup.to_parquet(os.path.join(self.folder, 'rollups', f'{stamp}.parquet'), index=False)
+
+            # The version index is written last so a crash never leaves a half-recorded version
+            with open(self._versions_file(), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'sha256': version.sha256,
+                    'version': version_key(version),
+                    'as_of': as_of.isoformat(timespec='seconds'),
+                    'recorded_at': recorded_at.isoformat(timespec='seconds'),
+                    'changed_rows': int((roles['op'] == 'upsert').sum()),
+                    'deleted_rows': int((roles['op'] == 'delete').sum()),
+                }) + '\n')
+            self._recorded.add(version.sha256)
+            self._compact_rollups()
+            return True
+
+    def _compact_rollups(self):
+        """Merge rollup parts into one file (content is unchanged, only the file count shrinks)"""
+        folder = os.path.join(self.folder, 'rollups')
+        parts = sorted(name for name in os.listdir(folder) if name.endswith('.parquet'))
+        if len(parts) < COMPACT_AFTER_PARTS:
+            return
+        merged = pd.concat([pd.read_parquet(os.path.join(folder, name)) for name in parts], ignore_index=True)
+        target = os.path.join(folder, f'{parts[-1][:-len(".parquet")]}-compacted.parquet')
+        merged.to_parquet(target + '.tmp', index=False)
+        os.replace(target + '.tmp', target)
+        for name in parts:
+            if os.path.join(folder, name) != target:
+                os.remove(os.path.join(folder, name))
+
+    def rollups(self):
+        """All per-area rollups, one row per (version, Technology Area), oldest first"""
+        folder = os.path.join(self.folder, 'rollups')
+        try:
+            parts = sorted(name for name in os.listdir(folder) if name.endswith('.parquet'))
+        except OSError:
+            parts = []
+
+        with self._lock:
+            if parts != self._rollup_parts:
+                frames = [pd.read_parquet(os.path.join(folder, name)) for name in parts]
+                rollups = pd.concat(frames, ignore_index=True) if frames else \
+                    pd.DataFrame(columns=['Technology Area', 'total', 'open', 'closed', 'as_of', 'version'])
+                self._rollups = rollups.sort_values(['as_of', 'Technology Area'], kind='stable').reset_index(drop=True)
+                self._rollup_parts = parts
+            return self._rollups
+
+    def area_trend(self, tech_area=None):
+        """Open/closed roles over time for one Technology Area (or all areas combined)"""
+        rollups = self.rollups()
+        if tech_area is not None:
+            rollups = rollups[rollups['Technology Area'] == tech_area]
+        return rollups.groupby('as_of', sort=True)[['open', 'closed']].sum().reset_index()
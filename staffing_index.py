@@ -0,0 +1,160 @@
+"""
+Staffing Filter Index
+Per-value row-id index over the filterable columns of the detailed roles sheet, built once per
+data version, so a filter change is a set intersection instead of a scan of every column, plus
+cached sort orders so the roles table can be served one page at a time
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Columns indexed by default: the Detailed Data tab filters (add a column here to make it filterable)
+FILTER_COLUMNS = ['Status', 'Technology Area', 'TEAM NAME']
+# Number of recent filter results kept per index
+RESULT_CACHE_SIZE = 64
+
+
+class _ColumnIndex:
+    """Row ids of one column grouped by value: rows[offsets[i]:offsets[i + 1]] hold category i"""
+
+    def __init__(self, series):
+        values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+        self.categories = values.cat.categories
+        self.codes = values.cat.codes.to_numpy()
+        order = np.argsort(self.codes, kind='stable').astype(np.int64)
+        counts = np.bincount(self.codes + 1, minlength=len(self.categories) + 1)  # Slot 0 = missing
+        self.rows = order[counts[0]:]
+        self.offsets = np.concatenate([[0], np.cumsum(counts[1:])])
+
+    def value_codes(self, values):
+        codes = self.categories.get_indexer(list(values))
+        return np.unique(codes[codes >= 0])
+
+    def size(self, codes):
+        return int((self.offsets[codes + 1] - self.offsets[codes]).sum())
+
+    def row_ids(self, codes):
+        """Sorted row ids holding any of the category codes"""
+        if len(codes) == 1:
+            return self.rows[self.offsets[codes[0]]:self.offsets[codes[0] + 1]]
+        parts = [self.rows[self.offsets[code]:self.offsets[code + 1]] for code in codes]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def accepts(self, codes, row_ids):
+        """Boolean mask of which row_ids hold one of the category codes"""
+        lookup = np.zeros(len(self.categories) + 1, dtype=bool)  # Last slot catches code -1 (missing)
+        lookup[codes] = True
+        return lookup[self.codes[row_ids]]
+
+
+class FilterIndex:
+    """
+    Row-id index over the filter columns of one frame. filter() returns the sorted row
+    positions matching every active filter (values within a column are OR-ed, columns AND-ed).
+    """
+
+    def __init__(self, detailed_df, columns=None, cache_size=RESULT_CACHE_SIZE):
+        columns = FILTER_COLUMNS if columns is None else columns
+        self.frame = detailed_df  # Referenced, never copied or modified
+        self.length = len(detailed_df)
+        self.columns = {col: _ColumnIndex(detailed_df[col]) for col in columns if col in detailed_df.columns}
+        self.cache_size = cache_size
+        self._results = OrderedDict()
+        self._ranks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def filter(self, filters):
+        """
+        Return sorted row positions for filters ({column: [values]}); empty lists or
+        unindexed columns are ignored. Returns None when no filter is active (every row).
+        """
+        active = self._active(filters)
+        if not active:
+            return None
+
+        with self._lock:
+            rows = self._results.get(active)
+            if rows is not None:
+                self._results.move_to_end(active)
+                self.hits += 1
+                return rows
+            self.misses += 1
+
+        # Start from the most selective column and check the rest only on its rows,
+        # so the cost follows the smallest selection rather than the number of filters
+        selections = [(self.columns[col], self.columns[col].value_codes(values)) for col, values in active]
+        selections.sort(key=lambda item: item[0].size(item[1]))
+        index, codes = selections[0]
+        rows = index.row_ids(codes)
+        for index, codes in selections[1:]:
+            if not len(rows):
+                break
+            rows = rows[index.accepts(codes, rows)]
+        rows.flags.writeable = False
+        self._remember(active, rows)
+        return rows
+
+    def clear(self):
+        """Forget the cached filter results (the per-value row ids and sort orders are kept)"""
+        with self._lock:
+            self._results.clear()
+
+    def _active(self, filters):
+        """Canonical, hashable form of the active filters"""
+        return tuple(sorted(
+            (col, tuple(sorted(map(str, values)))) for col, values in filters.items()
+            if values and col in self.columns
+        ))
+
+    def _remember(self, key, rows):
+        with self._lock:
+            self._results[key] = rows
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+    def _order(self, column, ascending):
+        """
+        (order, rank) of the frame sorted by column (stable, missing values last): order lists
+        row positions in sorted order and rank[row] is the row's place in it
+        """
+        key = (column, ascending)
+        ranking = self._ranks.get(key)
+        if ranking is None:
+            values = self.frame[column].reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            order.flags.writeable = False
+            rank.flags.writeable = False
+            ranking = self._ranks[key] = (order, rank)
+        return ranking
+
+    def sorted_rows(self, filters, sort_by=None, ascending=True):
+        """
+        Row positions matching filters in display order (sorted by sort_by when given).
+        Each (filters, sort) result is cached, so paging through it only slices this array.
+        """
+        rows = self.filter(filters)
+        if sort_by is None or sort_by not in self.frame.columns:
+            return np.arange(self.length) if rows is None else rows
+
+        order, rank = self._order(sort_by, ascending)
+        if rows is None:
+            return order
+
+        key = ('sorted', self._active(filters), sort_by, ascending)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+
+        result = rows[np.argsort(rank[rows], kind='stable')]
+        result.flags.writeable = False
+        self._remember(key, result)
+        return result
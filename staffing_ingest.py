@@ -0,0 +1,162 @@
+"""
+Incremental Row-Level Ingestion
+Diffs each new parse of the detailed roles sheet against the previous one by 'Req ID'
+and re-types only the inserted and updated rows, so refresh cost follows the size of the edit
+"""
+
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from staffing_data import apply_detail_schema, CATEGORICAL_COLUMNS
+
+KEY_COLUMN = 'Req ID'
+# Rows without a Req ID are identified by these columns plus their occurrence number
+FALLBACK_KEY_COLUMNS = ['Technology Area', 'TEAM NAME', 'Worker Type', 'Location', 'Hiring Manager',
+                        'Target \nStart Date']
+# Above this share of changed rows a full re-type is cheaper than patching
+MAX_PATCH_FRACTION = 0.5
+
+RowChanges = namedtuple('RowChanges', ['inserted', 'updated', 'deleted'])
+
+
+def _key_text(series):
+    """Vectorized text form of a key column ('1001.0' and 1001 both become '1001')"""
+    numbers = pd.to_numeric(series, errors='coerce')
+    text = series.astype(object).where(series.notna(), None)
+    whole = numbers.notna() & (numbers == numbers.round())
+    text = text.where(~whole, numbers.where(whole, 0).astype('int64').astype(str))
+    return text.map(lambda v: v if v is None else str(v).strip()).replace('', None)
+
+
+def row_keys(detailed_df):
+    """
+    Return a unique key per row: the Req ID where present, otherwise a composite of
+    FALLBACK_KEY_COLUMNS. Repeated keys get an occurrence suffix ('REQ-1#2').
+    """
+    if KEY_COLUMN in detailed_df.columns:
+        keys = _key_text(detailed_df[KEY_COLUMN])
+    else:
+        keys = pd.Series([None] * len(detailed_df), index=detailed_df.index, dtype=object)
+
+    missing = keys.isna()
+    if missing.any():
+        parts = [detailed_df.loc[missing, col].astype(str) for col in FALLBACK_KEY_COLUMNS if col in detailed_df.columns]
+        composite = parts[0].str.cat(parts[1:], sep='|') if parts else pd.Series('row', index=keys.index[missing])
+        keys = keys.astype(object)
+        keys[missing] = '~' + composite
+
+    occurrence = keys.groupby(keys, sort=False).cumcount()
+    keys = keys.where(occurrence == 0, keys + '#' + (occurrence + 1).astype(str))
+    return keys.to_numpy(dtype=object)
+
+
+def row_hashes(detailed_df):
+    """Return a uint64 content hash per row"""
+    return pd.util.hash_pandas_object(detailed_df, index=False).to_numpy()
+
+
+def _match(old_keys, new_keys):
+    """Position of each new key among the old keys (-1 for new rows)"""
+    return pd.Index(old_keys, dtype=object).get_indexer(pd.Index(new_keys, dtype=object))
+
+
+def _diff(old_keys, old_hashes, new_keys, new_hashes, positions):
+    """RowChanges (arrays of keys) between two versions of the sheet, given _match's positions"""
+    found = positions >= 0
+    changed = np.zeros(len(new_keys), dtype=bool)
+    changed[found] = old_hashes[positions[found]] != new_hashes[found]
+    matched = np.zeros(len(old_keys), dtype=bool)
+    matched[positions[found]] = True
+    return RowChanges(new_keys[~found], new_keys[changed], old_keys[~matched])
+
+
+def change_count(changes):
+    """Total number of inserted, updated and deleted rows"""
+    return len(changes.inserted) + len(changes.updated) + len(changes.deleted)
+
+
+def _align_categories(left, right):
+    """Give the categorical columns of two frames the same categories so they concat as categoricals"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in left.columns and col in right.columns:
+            a, b = left[col], right[col]
+            if isinstance(a.dtype, pd.CategoricalDtype) and isinstance(b.dtype, pd.CategoricalDtype):
+                categories = a.cat.categories.union(b.cat.categories)
+                left[col] = a.cat.set_categories(categories)
+                right[col] = b.cat.set_categories(categories)
+    return left, right
+
+
+class IncrementalIngester:
+    """
+    Holds the typed detail frame of the last ingested version together with its row keys
+    and row hashes, and patches them from the next parse.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.frame = None        # Typed detail frame (schema applied)
+        self.keys = None         # Row keys, aligned with frame
+        self.hashes = None       # Raw-row hashes, aligned with frame
+        self.columns = None      # Raw column labels the hashes were computed from
+        self.last_changes = None  # RowChanges against the previous version (None without one)
+        self._lock = threading.Lock()
+
+    def row_index(self):
+        """Keys and hashes of the current frame, for storing beside the snapshot"""
+        return pd.DataFrame({'key': self.keys, 'hash': self.hashes})
+
+    def prime(self, version, typed_df, row_index):
+        """Adopt a typed frame loaded from a snapshot as the baseline for the next diff"""
+        with self._lock:
+            if self.version == version or row_index is None or len(row_index) != len(typed_df):
+                return
+            self._set(version, typed_df, row_index['key'].to_numpy(dtype=object),
+                      row_index['hash'].to_numpy(), list(typed_df.columns))
+
+    def ingest(self, raw_df, version=None):
+        """Return the typed frame for a fresh parse, re-typing only the rows that changed"""
+        with self._lock:
+            keys = row_keys(raw_df)
+            hashes = row_hashes(raw_df)
+            columns = list(raw_df.columns)
+
+            if self.frame is None or columns != self.columns:
+                return self._full(version, raw_df, keys, hashes, columns)
+
+            old_positions = _match(self.keys, keys)
+            changes = _diff(self.keys, self.hashes, keys, hashes, old_positions)
+            if change_count(changes) > MAX_PATCH_FRACTION * max(len(keys), 1):
+                return self._full(version, raw_df, keys, hashes, columns, changes)
+
+            unchanged = old_positions >= 0
+            unchanged[unchanged] = self.hashes[old_positions[unchanged]] == hashes[unchanged]
+            changed_positions = np.flatnonzero(~unchanged)
+
+            # Re-type only the inserted/updated rows and splice them between the kept rows
+            kept = self.frame.take(old_positions[unchanged])
+            fresh = apply_detail_schema(raw_df.take(changed_positions))
+            kept, fresh = _align_categories(kept.copy(), fresh)
+            combined = pd.concat([kept, fresh], ignore_index=True)
+            order = np.argsort(np.concatenate([np.flatnonzero(unchanged), changed_positions]), kind='stable')
+            frame = combined.take(order).reset_index(drop=True)
+
+            self._set(version, frame, keys, hashes, columns, changes)
+            return frame
+
+    def _full(self, version, raw_df, keys, hashes, columns, changes=None):
+        # changes stays None when there is no comparable previous version (first load, new columns)
+        frame = apply_detail_schema(raw_df).reset_index(drop=True)
+        self._set(version, frame, keys, hashes, columns, changes)
+        return frame
+
+    def _set(self, version, frame, keys, hashes, columns, changes=None):
+        self.version = version
+        self.frame = frame
+        self.keys = keys
+        self.hashes = hashes
+        self.columns = columns
+        self.last_changes = changes
@@ -0,0 +1,267 @@
+"""
+Staffing Metrics Cube
+Everything the dashboard's KPIs, comparison charts and filter cards need, computed once per
+data version from the detail sheet: per-area and per-team totals (roles, open, closed,
+investment) and a cube of role counts by Technology Area x TEAM NAME x Status x
+Recruitment Status x Location x Worker Type. The summary sheet is only cross-checked.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ['Technology Area', 'TEAM NAME', 'Status', 'Recruitment Status', 'Location', 'Worker Type']
+CLOSED_STATUS = 'Closed'
+# Detail-sheet column holding each role's estimated cost (summed into 'Est. Investment')
+COST_COLUMN = 'Est. Forecast'
+# Cross-check: summary investment may differ from the detail sheet's by this much (rounding)
+INVESTMENT_TOLERANCE = 1.0
+# Filter combinations whose role counts are remembered per cube
+ANSWER_CACHE_SIZE = 256
+
+AREA_COLUMNS = ['#', 'Technology Area', 'Leaders', '# of New Roles', 'Est. Investment', 'Open Roles', 'Closed Roles']
+TOTAL_COLUMNS = ['# of New Roles', 'Open Roles', 'Closed Roles', 'Est. Investment']
+
+
+def _codes(series):
+    """(categories, codes) of a column, reusing its codes when it is already categorical"""
+    values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    return values.cat.categories, values.cat.codes.to_numpy()
+
+
+def _closed(detailed_df):
+    if 'Status' not in detailed_df.columns:
+        return np.zeros(len(detailed_df), dtype=bool)
+    return (detailed_df['Status'] == CLOSED_STATUS).fillna(False).to_numpy(dtype=bool)
+
+
+def _costs(detailed_df):
+    if COST_COLUMN not in detailed_df.columns:
+        return None
+    return pd.to_numeric(detailed_df[COST_COLUMN], errors='coerce').fillna(0).to_numpy(dtype='float64')
+
+
+def rollup(detailed_df, by):
+    """
+    '# of New Roles', 'Open Roles', 'Closed Roles' and 'Est. Investment' per combination of the
+    `by` columns found in the detail sheet, in workbook order (rows missing a `by` value are left
+    out). Each total is one np.bincount over the combined category codes.
+    """
+    keys = [_codes(detailed_df[col]) for col in by]
+    shape = tuple(len(categories) for categories, _ in keys)
+    present = np.logical_and.reduce([codes >= 0 for _, codes in keys])
+    if not present.any():
+        return pd.DataFrame({col: pd.Series(dtype='object') for col in by + TOTAL_COLUMNS})
+
+    group = np.ravel_multi_index(tuple(codes[present] for _, codes in keys), shape)
+    size = int(np.prod(shape))
+    roles = np.bincount(group, minlength=size)
+    closed = np.bincount(group, weights=_closed(detailed_df)[present], minlength=size).astype('int64')
+    costs = _costs(detailed_df)
+    investment = (np.bincount(group, weights=costs[present], minlength=size) if costs is not None
+                  else np.full(size, np.nan))
+
+    groups, first = np.unique(group, return_index=True)
+    groups = groups[np.argsort(first)]  # Order of first appearance in the sheet
+    frame = pd.DataFrame({col: np.asarray(categories.take(positions))
+                          for (categories, _), col, positions in zip(keys, by, np.unravel_index(groups, shape))})
+    frame['# of New Roles'] = roles[groups]
+    frame['Open Roles'] = roles[groups] - closed[groups]
+    frame['Closed Roles'] = closed[groups]
+    frame['Est. Investment'] = investment[groups]
+    return frame
+
+
+def _leaders(detailed_df):
+    """Senior Leaders of each Technology Area, comma-separated in workbook order"""
+    if 'Senior Leader' not in detailed_df.columns:
+        return pd.Series(dtype='object')
+    pairs = detailed_df[['Technology Area', 'Senior Leader']].dropna().drop_duplicates()
+    return pairs.groupby('Technology Area', observed=True, sort=False)['Senior Leader'].agg(
+        lambda leaders: ', '.join(map(str, leaders)))
+
+
+def _summary_areas(summary_df):
+    """Summary-sheet rows keyed by Technology Area (first row per name)"""
+    if summary_df is None or 'Technology Area' not in summary_df.columns:
+        return pd.DataFrame()
+    rows = summary_df[summary_df['Technology Area'].notna()]
+    rows = rows.assign(**{'Technology Area': rows['Technology Area'].astype(str)})
+    return rows.drop_duplicates('Technology Area').set_index('Technology Area')
+
+
+def area_summary(detailed_df, summary_df=None):
+    """
+    Per Technology Area totals from the detail sheet (any number of areas), with '#' in workbook
+    order. 'Leaders' are the summary sheet's hand-maintained ones where it lists them, otherwise
+    the area's Senior Leaders from the detail sheet. Investment falls back to the summary
+    sheet's 'Est. Investment' when the detail sheet has no cost column.
+    """
+    areas = rollup(detailed_df, ['Technology Area'])
+    areas['Technology Area'] = areas['Technology Area'].astype(str)
+    areas['#'] = np.arange(1, len(areas) + 1)
+    summary = _summary_areas(summary_df)
+    leaders = areas['Technology Area'].map(_leaders(detailed_df))
+    if 'Leaders' in summary.columns:
+        listed = summary['Leaders'].dropna().astype(str).str.strip()
+        leaders = areas['Technology Area'].map(listed[listed != '']).fillna(leaders)
+    areas['Leaders'] = leaders.fillna('').astype(str)
+    if COST_COLUMN not in detailed_df.columns:
+        investment = summary['Est. Investment'] if 'Est. Investment' in summary.columns else pd.Series(dtype='float64')
+        areas['Est. Investment'] = areas['Technology Area'].map(investment).astype('float64').fillna(0)
+    return areas[AREA_COLUMNS]
+
+
+def team_summary(detailed_df):
+    """Per (Technology Area, TEAM NAME) totals from the detail sheet"""
+    if 'TEAM NAME' not in detailed_df.columns:
+        return pd.DataFrame(columns=['Technology Area', 'TEAM NAME'] + TOTAL_COLUMNS)
+    teams = rollup(detailed_df, ['Technology Area', 'TEAM NAME'])
+    teams['Est. Investment'] = teams['Est. Investment'].fillna(0)
+    return teams
+
+
+def cross_check(areas, summary_df):
+    """
+    Differences between the detail-derived area totals and the summary sheet's hand-maintained
+    ones, as human-readable strings (empty when they agree or there is no summary sheet)
+    """
+    summary = _summary_areas(summary_df)
+    if summary.empty:
+        return []
+    issues = []
+    for area, *values in areas[['Technology Area'] + TOTAL_COLUMNS].itertuples(index=False, name=None):
+        if area not in summary.index:
+            issues.append(f"'{area}' has {values[0]:,} roles in the detail sheet but no summary row")
+            continue
+        for col, value in zip(TOTAL_COLUMNS, values):
+            if col not in summary.columns or pd.isna(summary.at[area, col]):
+                continue
+            expected = summary.at[area, col]
+            tolerance = INVESTMENT_TOLERANCE if col == 'Est. Investment' else 0
+            if abs(float(expected) - float(value)) > tolerance:
+                issues.append(f"'{area}' {col}: summary sheet {expected:,.0f}, detail sheet {value:,.0f}")
+    return issues
+
+
+def plan_totals(detailed_df, areas):
+    """Overall KPIs over every role in the detail sheet"""
+    total_roles = len(detailed_df)
+    total_closed = int(_closed(detailed_df).sum())
+    costs = _costs(detailed_df)
+    total_investment = float(costs.sum()) if costs is not None else float(areas['Est. Investment'].sum())
+    return {
+        'total_roles': total_roles,
+        'total_investment': total_investment,
+        'total_open': total_roles - total_closed,
+        'total_closed': total_closed,
+        'close_rate': (total_closed / total_roles * 100) if total_roles > 0 else 0,
+        'avg_cost': total_investment / total_roles if total_roles > 0 else 0,
+    }
+
+
+def _area_metrics(tech_areas_df):
+    """Per-area frame with the derived rates every tab uses"""
+    areas = tech_areas_df.copy()
+    roles = areas['# of New Roles'].astype('float64')
+    areas['Close Rate %'] = areas['Closed Roles'].astype('float64') / roles * 100
+    areas['Avg Cost per Role'] = areas['Est. Investment'] / roles
+    return areas
+
+
+class MetricsCube:
+    """
+    Read-only metrics for one data version, all derived from the detail sheet.
+
+    areas:  per Technology Area totals plus 'Close Rate %' and 'Avg Cost per Role'
+    teams:  per (Technology Area, TEAM NAME) totals
+    totals: overall KPIs (total_roles, total_investment, total_open, total_closed, close_rate, avg_cost)
+    cells:  role counts (total and closed) per combination of CUBE_DIMENSIONS that occurs in
+            the detail sheet, answering the filter cards' counts through roles()
+    discrepancies: where the summary sheet (optional) disagrees with the detail sheet
+
+    The cells carry role counts only, since no view shows investment for a filter selection.
+    areas, teams and totals (the only places investment appears) come straight from
+    rollup()/plan_totals - one bincount pass over the detail sheet each - not from the cells.
+    """
+
+    def __init__(self, summary_df, detailed_df, answer_cache_size=ANSWER_CACHE_SIZE):
+        self.areas = _area_metrics(area_summary(detailed_df, summary_df))
+        self.teams = team_summary(detailed_df)
+        self.totals = plan_totals(detailed_df, self.areas)
+        self.discrepancies = cross_check(self.areas, summary_df)
+
+        self.dimensions = [col for col in CUBE_DIMENSIONS if col in detailed_df.columns]
+        self._build_cells(detailed_df)
+        self._answers = OrderedDict()  # Bounded LRU of roles() answers
+        self._answer_cache_size = answer_cache_size
+        self._lock = threading.Lock()
+
+    def _build_cells(self, detailed_df):
+        if not self.dimensions:
+            self.cells = pd.DataFrame({'roles': [len(detailed_df)], 'closed': [0]})
+            self._codes, self._categories = {}, {}
+            self._roles = self.cells['roles'].to_numpy()
+            self._closed = self.cells['closed'].to_numpy()
+            return
+
+        grouped = detailed_df[self.dimensions].copy()
+        for col in self.dimensions:
+            if not isinstance(grouped[col].dtype, pd.CategoricalDtype):
+                grouped[col] = grouped[col].astype('category')
+        closed = (grouped['Status'] == CLOSED_STATUS) if 'Status' in grouped.columns else pd.Series(False, index=grouped.index)
+        grouped['closed'] = closed.fillna(False).astype('int64')
+
+        cells = grouped.groupby(self.dimensions, observed=True, dropna=False).agg(
+            roles=('closed', 'size'), closed=('closed', 'sum')).reset_index()
+        self.cells = cells
+
+        # Per-dimension integer codes of each cell, so filters are lookups instead of string compares
+        self._categories = {}
+        self._codes = {}
+        for col in self.dimensions:
+            values = cells[col].astype('category')
+            self._categories[col] = values.cat.categories
+            self._codes[col] = values.cat.codes.to_numpy()
+        self._roles = cells['roles'].to_numpy()
+        self._closed = cells['closed'].to_numpy()
+
+    def values(self, dimension):
+        """Sorted non-empty values of a cube dimension (for filter options)"""
+        if dimension not in self._categories:
+            return []
+        return sorted(str(v) for v in self._categories[dimension] if str(v))
+
+    def roles(self, filters=None):
+        """
+        Return (total, open, closed) role counts for a filter combination.
+        filters maps a dimension to the list of accepted values; missing or empty lists mean 'All'.
+        """
+        active = tuple(sorted(
+            (dim, tuple(sorted(map(str, values)))) for dim, values in (filters or {}).items()
+            if values and dim in self._codes
+        ))
+        with self._lock:
+            answer = self._answers.get(active)
+            if answer is not None:
+                self._answers.move_to_end(active)
+                return answer
+
+        mask = np.ones(len(self._roles), dtype=bool)
+        for dim, values in active:
+            categories = self._categories[dim]
+            lookup = np.zeros(len(categories) + 1, dtype=bool)  # Last slot catches code -1 (missing)
+            codes = categories.get_indexer(list(values))
+            lookup[codes[codes >= 0]] = True
+            mask &= lookup[self._codes[dim]]
+
+        total = int(self._roles[mask].sum())
+        closed = int(self._closed[mask].sum())
+        answer = (total, total - closed, closed)
+        with self._lock:
+            self._answers[active] = answer
+            while len(self._answers) > self._answer_cache_size:
+                self._answers.popitem(last=False)
+        return answer
@@ -0,0 +1,246 @@
+"""
+Staffing Data Store
+Keeps the last good copy of the staffing data in memory so pages never go blank, and
+revalidates it in a background thread while the workbook can't be read (open in Excel,
+mid-sync in OneDrive). Loaded data lives once per process and workbook version, shared
+read-only by every session.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import namedtuple, OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# One published copy of the data: the workbook version it came from, the loaded data,
+# and when it was last confirmed to match the workbook
+Snapshot = namedtuple('Snapshot', ['version', 'data', 'confirmed_at'])
+
+
+class SnapshotStore:
+    """
+    Stale-while-revalidate holder for the current data.
+
+    `loader` is a callable returning (version, data) that raises while the workbook
+    is unreadable. The main thread publishes every successful load; when a load fails,
+    revalidate() starts a single background thread that retries the loader with
+    exponential backoff and swaps the new data in once it succeeds.
+    """
+
+    def __init__(self, loader, initial_delay=2.0, max_delay=60.0):
+        self._loader = loader
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.last_error = None
+        self.failed_attempts = 0
+
+    @property
+    def snapshot(self):
+        """The current Snapshot, or None before the first successful load"""
+        return self._snapshot
+
+    @property
+    def revalidating(self):
+        """True while the background thread is retrying the workbook"""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    @property
+    def stale(self):
+        """True when the served data could not be confirmed against the workbook on the last load"""
+        return self.last_error is not None
+
+    def publish(self, version, data, confirmed_at=None):
+        """Atomically make (version, data) the current snapshot"""
+        snapshot = Snapshot(version, data, confirmed_at or datetime.now())
+        with self._lock:
+            self._snapshot = snapshot
+            if confirmed_at is None:
+                self.last_error = None
+                self.failed_attempts = 0
+
+    def fail(self, error):
+        """Record a failed load and start revalidating in the background"""
+        with self._lock:
+            self.last_error = error
+            self.failed_attempts += 1
+        self.revalidate()
+
+    def revalidate(self):
+        """Start the background retry thread unless it is already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._retry_loop, name='staffing-revalidate', daemon=True)
+            self._thread.start()
+
+    def age_seconds(self):
+        """Seconds since the current snapshot was last confirmed against the workbook"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        return (datetime.now() - snapshot.confirmed_at).total_seconds()
+
+    def _retry_loop(self):
+        delay = self.initial_delay
+        while True:
+            time.sleep(delay)
+            try:
+                version, data = self._loader()
+            except Exception as e:
+                with self._lock:
+                    self.last_error = e
+                    self.failed_attempts += 1
+                delay = min(delay * 2, self.max_delay)
+                continue
+            self.publish(version, data)
+            return
+
+
+class DataStore:
+    """
+    Process-wide, read-only data keyed by (name, workbook version).
+
+    Every session references the same objects instead of receiving its own copy, so memory
+    grows with the number of versions kept (max_versions), not with the number of viewers.
+    Entries must not be modified in place; with pandas copy-on-write a view that changes
+    a frame only copies what it changes.
+    """
+
+    def __init__(self, max_versions=2):
+        self.max_versions = max_versions
+        self._entries = OrderedDict()   # (name, version) -> data
+        self._versions = OrderedDict()  # version -> None, most recently used last
+        self._lock = threading.Lock()
+        self._loading = {}              # (name, version) -> Lock, so each entry is loaded once
+        self._report = None
+
+    def peek(self, name, version):
+        """The stored data, or None if it hasn't been loaded"""
+        return self._entries.get((name, version))
+
+    def get(self, name, version, loader):
+        """Return the data for (name, version), calling loader() once if it isn't stored yet"""
+        key = (name, version)
+        data = self._entries.get(key)
+        if data is not None:
+            self._touch(version)
+            return data
+
+        with self._lock:
+            lock = self._loading.setdefault(key, threading.Lock())
+        with lock:
+            data = self._entries.get(key)
+            if data is None:
+                data = loader()
+                with self._lock:
+                    self._entries[key] = data
+                    self._versions[version] = None
+                    self._versions.move_to_end(version)
+                    self._report = None
+                    while len(self._versions) > self.max_versions:
+                        self._drop(next(iter(self._versions)))
+            with self._lock:
+                self._loading.pop(key, None)
+        return data
+
+    def evict(self, version):
+        """Drop every entry of a replaced version"""
+        with self._lock:
+            self._drop(version)
+
+    def versions(self):
+        return list(self._versions)
+
+    def _touch(self, version):
+        with self._lock:
+            if version in self._versions:
+                self._versions.move_to_end(version)
+
+    def _drop(self, version):
+        self._versions.pop(version, None)
+        for key in [key for key in self._entries if key[1] == version]:
+            del self._entries[key]
+        self._report = None
+
+    def memory(self):
+        """Bytes held per entry name and in total (objects shared between entries counted once)"""
+        with self._lock:
+            if self._report is None:
+                seen = set()
+                by_name = {}
+                for (name, _), data in self._entries.items():
+                    by_name[name] = by_name.get(name, 0) + object_bytes(data, seen)
+                self._report = {'versions': len(self._versions), 'by_name': by_name,
+                                'total': sum(by_name.values())}
+            return self._report
+
+
+def object_bytes(obj, seen=None):
+    """Approximate memory held by obj (frames, arrays and the containers/objects around them)"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        # Views share their base's buffer
+        return object_bytes(obj.base, seen) if obj.base is not None else obj.nbytes
+    if isinstance(obj, dict):
+        return sum(object_bytes(v, seen) for v in obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(object_bytes(v, seen) for v in obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return sys.getsizeof(obj) + object_bytes(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def process_memory(pid=None):
+    """Resident memory in bytes of a process, this one by default (None if it can't be determined)"""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def format_bytes(size):
+    """Short human-readable size, e.g. '840 KB', '12.3 MB'"""
+    if size is None:
+        return 'n/a'
+    if size < 1024 * 1024:
+        return f'{size / 1024:.0f} KB'
+    if size < 1024 ** 3:
+        return f'{size / 1024 ** 2:.1f} MB'
+    return f'{size / 1024 ** 3:.2f} GB'
+
+
+def format_age(seconds):
+    """Short human-readable age, e.g. '45s', '12 min', '3.5 h'"""
+    if seconds is None:
+        return 'n/a'
+    if seconds < 60:
+        return f'{seconds:.0f}s'
+    if seconds < 3600:
+        return f'{seconds / 60:.0f} min'
+    return f'{seconds / 3600:.1f} h'
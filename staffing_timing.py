@@ -0,0 +1,145 @@
+"""
+Staffing Timing Spans
+Lightweight wall-clock spans around the stages of a page run (or a static build). The outermost
+span on a thread is the run: when it ends, the run's breakdown is folded into rolling per-stage
+percentiles for the dashboard's performance panel and, when a log file is set, appended to a
+JSON-lines log.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque, OrderedDict
+from contextlib import nullcontext
+from datetime import datetime
+
+import numpy as np
+
+# Set STAFFING_TIMING=0 to switch the spans off entirely
+TIMING_ENABLED = os.environ.get('STAFFING_TIMING', '1') != '0'
+# Runs are only written to disk when STAFFING_TIMING_LOG names a file, so a page run never
+# waits on the log by default
+TIMING_LOG = os.environ.get('STAFFING_TIMING_LOG') or None
+# The log is rotated to <name>.1 once it grows past this size
+MAX_LOG_BYTES = 5 * 1024 * 1024
+# Runs kept per stage for the rolling percentiles, and sessions kept for "last run"
+ROLLING_WINDOW = 200
+MAX_SESSIONS = 256
+
+_DISABLED = nullcontext()
+
+
+class _Span:
+    __slots__ = ('timer', 'name', 'session', 'start', 'depth', 'run')
+
+    def __init__(self, timer, name, session):
+        self.timer = timer
+        self.name = name
+        self.session = session
+
+    def __enter__(self):
+        local = self.timer._local
+        self.run = getattr(local, 'run', None)
+        if self.run is None:
+            self.run = local.run = {'root': self.name, 'session': self.session, 'spans': [], 'depth': 0,
+                                    'started': time.perf_counter(), 'at': datetime.now()}
+        self.depth = self.run['depth']
+        self.run['depth'] += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        run = self.run
+        run['depth'] -= 1
+        run['spans'].append((self.name, self.depth, self.start - run['started'], elapsed, exc_type is not None))
+        if self.depth == 0:
+            self.timer._local.run = None
+            self.timer._finish(run)
+        return False
+
+
+class Timer:
+    """
+    span(name) times a block; nested spans on the same thread form one run. Pass
+    session= on the outermost span to remember the run as that session's last run.
+    """
+
+    def __init__(self, log_path=TIMING_LOG, enabled=TIMING_ENABLED, window=ROLLING_WINDOW):
+        self.log_path = log_path
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._samples = {}               # stage -> deque of seconds
+        self._window = window
+        self._last_runs = OrderedDict()  # session -> last finished run
+
+    def span(self, name, session=None):
+        if not self.enabled:
+            return _DISABLED
+        return _Span(self, name, session)
+
+    def timed(self, name, session=None):
+        """Decorator timing every call as span `name` (session may be a callable returning the id)"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, name, session() if callable(session) else session):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _finish(self, run):
+        spans = sorted(run['spans'], key=lambda span: span[2])
+        record = {
+            'at': run['at'].isoformat(timespec='milliseconds'),
+            'root': run['root'],
+            'session': run['session'],
+            'total_ms': round(spans[0][3] * 1000, 3) if spans else 0.0,
+            'spans': [{'name': name, 'depth': depth, 'start_ms': round(start * 1000, 3),
+                       'ms': round(elapsed * 1000, 3), **({'error': True} if failed else {})}
+                      for name, depth, start, elapsed, failed in spans],
+        }
+        with self._lock:
+            for name, _, _, elapsed, _ in spans:
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples[name] = deque(maxlen=self._window)
+                samples.append(elapsed)
+            if run['session'] is not None:
+                self._last_runs[run['session']] = record
+                self._last_runs.move_to_end(run['session'])
+                while len(self._last_runs) > MAX_SESSIONS:
+                    self._last_runs.popitem(last=False)
+            self._write(record)
+
+    def _write(self, record):
+        if not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > MAX_LOG_BYTES:
+                os.replace(self.log_path, self.log_path + '.1')
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError:
+            pass  # Timing must never break a page
+
+    def last_run(self, session):
+        """The last finished run recorded for a session (None if there is none)"""
+        return self._last_runs.get(session)
+
+    def percentiles(self):
+        """{stage: (p50_ms, p95_ms, runs)} over the rolling window"""
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items() if values}
+        return {name: (float(np.percentile(values, 50)) * 1000, float(np.percentile(values, 95)) * 1000, len(values))
+                for name, values in samples.items()}
+
+
+# Process-wide timer used by the dashboard and the static generator
+TIMER = Timer()